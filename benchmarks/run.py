@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+"""PySignature benchmark suite.
+
+Measures the per call cost of typechecked functions against
+their untyped versions, the cost of binding each kind of
+argument and the throughput of every type assertion as the
+size and nesting of the values grow, with passing and failing
+values measured separately.
+
+Results are written as JSON (seconds per call, by benchmark
+name). Given a previous result with --compare, the benchmarks
+that got slower than the allowed threshold are reported and
+the script exits with status 1.
+
+    $ python benchmarks/run.py --output baseline.json
+    $ python benchmarks/run.py --compare baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pysignature
+from pysignature import typechecked
+from pysignature.exceptions import PySignatureError
+from pysignature.types import (
+    Any, String, Or, Tuple, List, InstanceOf, Set, Boolean,
+    Dictionary, Numeric, Record, compile_assertion
+)
+
+def passing(fn, *args, **kwargs):
+    """Benchmark body calling fn with arguments that pass."""
+    def run():
+        fn(*args, **kwargs)
+    return run
+
+def failing(fn, *args, **kwargs):
+    """Benchmark body calling fn with arguments that fail."""
+    def run():
+        try:
+            fn(*args, **kwargs)
+        except PySignatureError:
+            pass
+        else:
+            raise AssertionError('Benchmark value passed: %r' % (args,))
+    return run
+
+def nested(assertion, value, depth):
+    """Wrap an assertion and a value in `depth` levels of List."""
+    for _ in range(depth):
+        assertion = List(assertion)
+        value = [value]
+    return assertion, value
+
+def decorated_benchmarks():
+    @typechecked(a=int, b=Numeric, c=String)
+    def positional(a, b, c):
+        pass
+
+    @typechecked(a=int, b=Numeric, c=String)
+    def defaults(a, b=1.0, c='c'):
+        pass
+
+    @typechecked(a=int, _variadic=Numeric)
+    def variadic(a, *args):
+        pass
+
+    @typechecked(a=int, _named=Numeric)
+    def named(a, **kwargs):
+        pass
+
+    # bind.* call the check of the Signature directly, to
+    # measure binding without the wrapper or the function.
+    extra = range(10)
+    options = dict(('k%i' % i, i) for i in range(10))
+    return {
+        'call.untyped': passing(positional.untyped, 1, 2.0, 'c'),
+        'call.typechecked': passing(positional, 1, 2.0, 'c'),
+        'call.typechecked.fail': failing(positional, 'a', 'b', 1),
+        'bind.positional': passing(positional.signature.check, 1, 2.0, 'c'),
+        'bind.keyword': passing(positional.signature.check, c='c', b=2.0, a=1),
+        'bind.defaults': passing(defaults.signature.check, 1),
+        'bind.variadic.10': passing(variadic.signature.check, 1, *extra),
+        'bind.variadic.10.fail': failing(variadic.signature.check, 1, *(['a'] * 10)),
+        'bind.named.10': passing(named.signature.check, 1, **options),
+        'bind.named.10.fail': failing(named.signature.check, 1, **dict.fromkeys(options, 'a')),
+    }
+
+def assertion_benchmarks(sizes, depths):
+    class Base(object):
+        pass
+
+    benchmarks = {}
+    def add(name, assertion, good, bad):
+        checker = compile_assertion(assertion)
+        benchmarks['assert.%s' % name] = passing(checker, good)
+        benchmarks['assert.%s.fail' % name] = failing(checker, bad)
+
+    add('Numeric', Numeric, 1.5, 'a')
+    add('InstanceOf', InstanceOf(Base), Base(), object())
+    add('Or.3', Or(Boolean, InstanceOf(Base), Numeric), 1.5, 'a')
+    add('Tuple.3', Tuple(int, String, Numeric), (1, 'a', 2.0), (1, 'a', 'b'))
+    for size in sizes:
+        add('List.%i' % size, List(Numeric), range(size), range(size - 1) + ['a'])
+        add('Set.%i' % size, Set(Numeric), set(range(size)), set(range(size - 1) + ['a']))
+        good = dict(('k%i' % i, i) for i in range(size))
+        bad = dict(good, last='a')
+        add('Dictionary.%i' % size, Dictionary(String, Numeric), good, bad)
+        add('List.Or.%i' % size, List(Or(Boolean, Numeric)), range(size), range(size - 1) + ['a'])
+        add('List.Tuple.%i' % size, List(Tuple(String, Numeric)),
+            [('a', i) for i in range(size)], [('a', i) for i in range(size - 1)] + [(1, 1)])
+        item = Record({'id': int, 'name': String}, optional={'tags': List(String)})
+        add('Record.%i' % size, Record({'items': List(item)}),
+            {'items': [{'id': i, 'name': 'a', 'tags': ['t']} for i in range(size)]},
+            {'items': [{'id': i, 'name': 'a'} for i in range(size - 1)] + [{'id': 'a'}]})
+        # The closures of the plain containers equivalent to the Record,
+        # to compare the walk of the Record with them.
+        add('Record.Dictionary.%i' % size,
+            Dictionary(String, List(Dictionary(String, Or(List(String), Numeric, String)))),
+            {'items': [{'id': i, 'name': 'a', 'tags': ['t']} for i in range(size)]},
+            {'items': [{'id': i, 'name': 'a'} for i in range(size - 1)] + [{1: 'a'}]})
+    for depth in depths:
+        assertion, good = nested(Numeric, 1, depth)
+        _, bad = nested(Numeric, 'a', depth)
+        add('List.depth.%i' % depth, assertion, good, bad)
+        assertion, good = nested(Dictionary(String, Any), {'a': 1}, depth)
+        _, bad = nested(Dictionary(String, Any), {1: 1}, depth)
+        add('Dictionary.depth.%i' % depth, assertion, good, bad)
+    return benchmarks
+
+def measure(body, repeat, min_time):
+    """Best time per call, in seconds."""
+    timer = timeit.Timer(body)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 10 ** 7:
+            break
+        number *= 10
+    return min(timer.repeat(repeat, number)) / number
+
+def run(quick=False, pattern=None):
+    sizes = [10, 1000] if quick else [10, 1000, 100000]
+    depths = [1, 8] if quick else [1, 8, 64]
+    benchmarks = decorated_benchmarks()
+    benchmarks.update(assertion_benchmarks(sizes, depths))
+    results = {}
+    for name in sorted(benchmarks):
+        if pattern is None or pattern in name:
+            results[name] = measure(benchmarks[name], 3, 0.01 if quick else 0.1)
+    return {
+        'pysignature': pysignature.__version__,
+        'python': platform.python_version(),
+        'results': results,
+    }
+
+def compare(current, baseline, threshold):
+    """Return the benchmarks slower than the baseline by more
+    than the threshold, as (name, baseline, current) tuples."""
+    regressions = []
+    for name, seconds in sorted(current['results'].iteritems()):
+        before = baseline['results'].get(name)
+        if before and seconds > before * (1 + threshold):
+            regressions.append((name, before, seconds))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the PySignature benchmarks.')
+    parser.add_argument('--output', help='write the JSON results to this file')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown against the baseline (default: 0.2)')
+    parser.add_argument('--filter', help='only run benchmarks whose name contains this')
+    parser.add_argument('--quick', action='store_true',
+                        help='smaller sizes and shorter measurements')
+    args = parser.parse_args(argv)
+
+    current = run(args.quick, args.filter)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(current, output, indent=2, sort_keys=True)
+    else:
+        json.dump(current, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+    if args.compare:
+        with open(args.compare) as stored:
+            baseline = json.load(stored)
+        regressions = compare(current, baseline, args.threshold)
+        for name, before, after in regressions:
+            sys.stderr.write('REGRESSION %s: %.3gs -> %.3gs (%+.0f%%)\n'
+                             % (name, before, after, (after / before - 1) * 100))
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
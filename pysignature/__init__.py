@@ -5,5 +5,12 @@ __version__ = '0.0.1'
 from . import types
 from . import exceptions
 from . import signature
+from . import sampling
+from . import stats
+from . import parallel
+from . import switch
+from . import cache
+from . import registration
+from . import profiling
 from .exceptions import PySignatureError
 from .signature import typechecked
@@ -0,0 +1,131 @@
+"""Limits on the work done to typecheck a call.
+
+Signatures created with the `_max_elements`,
+`_max_depth` or `_deadline` options compile their
+type spec with a Budget, which accounts every
+container assertion (List, Set, Dictionary and the
+containers nested in a Record) as it is entered:
+
+* its size is added to the elements of the call,
+  before any of them is visited;
+* its nesting depth is compared with the maximum;
+* the deadline (in seconds since the call started)
+  is compared with the clock, and again every
+  TICK elements while its elements are checked.
+
+Values of the wrong type (e.g. a string given to a
+List) are not accounted, so they fail as usual.
+
+Exceeding any of them aborts the check with a
+BudgetExceededError. Other assertions are compiled
+as usual and pay nothing; that includes Tuple, whose
+size and nesting are bounded by the spec itself.
+"""
+import threading
+import timeit
+from itertools import chain, islice
+from pysignature.exceptions import BudgetExceededError
+from pysignature.types import List, Set, Dictionary, Record
+
+timer = timeit.default_timer
+
+# Elements checked between two readings of the clock.
+TICK = 1024
+
+# Type of the values accounted by each container assertion.
+CONTAINERS = ((List, list), (Set, set), (Dictionary, dict), (Record, dict))
+
+class _State(threading.local):
+    """Accounting of the call being checked in a thread."""
+    elements = 0
+    depth = 0
+    expires = None
+
+class Budget(object):
+    """Limits of a signature, and the hook that
+    compiles its container assertions with them."""
+    def __init__(self, max_elements=None, max_depth=None, deadline=None):
+        self.max_elements = max_elements
+        self.max_depth = max_depth
+        self.deadline = deadline
+        self.state = _State()
+
+    def start(self):
+        """Reset the accounting for a new call."""
+        state = self.state
+        state.elements = 0
+        state.depth = 0
+        if self.deadline is not None:
+            state.expires = timer() + self.deadline
+
+    def rooted(self, checker):
+        """Check function that starts a new call before
+        running checker (for values checked on their
+        own, such as the return value)."""
+        start = self.start
+        def check(value):
+            start()
+            return checker(value)
+        return check
+
+    def __call__(self, assertion, checker):
+        """Hook for pysignature.types.instrumented."""
+        for cls, container in CONTAINERS:
+            if isinstance(assertion, cls):
+                break
+        else:
+            return checker
+        state = self.state
+        spend = self.spend
+        def check(value):
+            if isinstance(value, container):
+                spend(value, state.depth + 1)
+            state.depth += 1
+            try:
+                return checker(value)
+            finally:
+                state.depth -= 1
+        return check
+
+    def visit(self, value, path):
+        """Account a container nested in a Record at
+        path, a (parent, key) link."""
+        depth = self.state.depth
+        if self.max_depth is not None:
+            while path is not None and depth <= self.max_depth:
+                path = path[0]
+                depth += 1
+        self.spend(value, depth)
+
+    def ticks(self, items):
+        """Iterable over items that compares the deadline
+        with the clock every TICK elements."""
+        if self.deadline is None:
+            return items
+        return chain.from_iterable(self._chunks(items))
+
+    def _chunks(self, items):
+        iterator = iter(items)
+        expires = self.state.expires
+        while True:
+            chunk = list(islice(iterator, TICK))
+            if not chunk:
+                return
+            if expires is not None and timer() > expires:
+                raise BudgetExceededError('deadline of %ss exceeded' % self.deadline)
+            yield chunk
+
+    def spend(self, value, depth):
+        """Account entering a container at the given depth."""
+        state = self.state
+        if self.max_elements is not None:
+            try:
+                state.elements += len(value)
+            except TypeError:
+                pass
+            if state.elements > self.max_elements:
+                raise BudgetExceededError('more than %i elements' % self.max_elements)
+        if self.max_depth is not None and depth > self.max_depth:
+            raise BudgetExceededError('nesting deeper than %i levels' % self.max_depth)
+        if state.expires is not None and timer() > state.expires:
+            raise BudgetExceededError('deadline of %ss exceeded' % self.deadline)
@@ -0,0 +1,140 @@
+"""Cache of the values that already passed an
+assertion, so unchanged containers passed again
+and again are not walked on every call.
+
+Container assertions (List, Set, Dictionary and
+Tuple) accept a VerdictCache in their `cache`
+option, one per assertion:
+
+    config = Dictionary(String, Any, cache=VerdictCache(128))
+
+Only values that cannot change unnoticed are
+remembered:
+
+* tuples and frozensets of strings, numbers and
+  None, by value and element types;
+* any other object once it is declared unchanging
+  with `freeze(obj)`. `touch(obj)` tells that a
+  frozen object was modified on purpose, and
+  `thaw(obj)` forgets it. Frozen objects that
+  support weak references are not kept alive by
+  this module; the rest (plain lists, dicts and
+  sets) are kept until thawed, so their id can
+  not be reused by another object.
+
+Containers checked with a sampling strategy are
+never remembered, as they were not fully checked.
+"""
+import itertools
+import weakref
+from collections import OrderedDict
+
+# Element types of the tuples and frozensets
+# remembered by value.
+ATOMIC_TYPES = frozenset([str, unicode, int, long, float, bool, type(None)])
+
+_versions = itertools.count(1)
+_frozen = {}
+
+def freeze(obj):
+    """Declare that obj will not be modified,
+    so caches can remember it passed."""
+    _frozen[id(obj)] = (_reference(obj), next(_versions))
+
+def touch(obj):
+    """Forget every verdict about a frozen object
+    that was modified, keeping it frozen."""
+    if version(obj) is not None:
+        freeze(obj)
+
+def thaw(obj):
+    """Undo freeze, forgetting every verdict about obj."""
+    if version(obj) is not None:
+        del _frozen[id(obj)]
+
+def version(obj):
+    """Current version of a frozen object, or None."""
+    entry = _frozen.get(id(obj))
+    if entry is not None and entry[0]() is obj:
+        return entry[1]
+    return None
+
+def _reference(obj):
+    key = id(obj)
+    def forget(ref):
+        entry = _frozen.get(key)
+        if entry is not None and entry[0] is ref:
+            del _frozen[key]
+    try:
+        return weakref.ref(obj, forget)
+    except TypeError:
+        return lambda: obj
+
+class VerdictCache(object):
+    """Bounded LRU set of the values that passed
+    an assertion. Counts its hits, misses (values
+    that could not be remembered included) and
+    evictions."""
+    def __init__(self, size=1024):
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, value):
+        """Key that identifies value in its current
+        state, or None if it cannot be remembered."""
+        cls = type(value)
+        if cls is tuple or cls is frozenset:
+            types = tuple(map(type, value))
+            if ATOMIC_TYPES.issuperset(types):
+                return (cls, value, types)
+        current = version(value)
+        if current is not None:
+            return (id(value), current)
+        return None
+
+    def wrap(self, check):
+        """Check function that skips the values
+        this cache remembers and remembers the
+        ones that pass."""
+        entries = self.entries
+        def cached(value):
+            key = self.key(value)
+            if key is not None:
+                try:
+                    entries[key] = entries.pop(key)
+                    self.hits += 1
+                    return
+                except KeyError:
+                    pass
+            self.misses += 1
+            check(value)
+            if key is not None:
+                self.store(key)
+        return cached
+
+    def store(self, key):
+        self.entries[key] = True
+        while len(self.entries) > self.size:
+            try:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            except KeyError:
+                break
+
+    def clear(self):
+        """Forget every value and reset the counters."""
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __getstate__(self):
+        # Keys of frozen objects are only valid in this process.
+        return {'size': self.size}
+
+    def __setstate__(self, state):
+        self.__init__(state['size'])
+
+    def __repr__(self):
+        return 'VerdictCache(%i)' % self.size
@@ -4,7 +4,61 @@ exception classes.
 All exceptions of this project
 inherit from the main PySignatureError
 exception class.
+
+Messages are only formatted when the exception
+is turned into a string, and long values are
+truncated, since many of these exceptions are
+caught and discarded (e.g. by an Or assertion).
 """
+import sys
+from itertools import islice
+from repr import Repr
+
+# Maximum length of the description of a value in a message.
+MAX_TARGET_LENGTH = 200
+
+# Builtin containers described element by element, with their
+# subclasses (OrderedDict, tracked containers...) described as them.
+_CONTAINERS = (tuple, list, set, frozenset, dict)
+
+class _TargetRepr(Repr):
+    def repr1(self, x, level):
+        if type(x) not in _CONTAINERS and isinstance(x, _CONTAINERS):
+            for base in _CONTAINERS:
+                if isinstance(x, base):
+                    return getattr(self, 'repr_' + base.__name__)(x, level)
+        return Repr.repr1(self, x, level)
+
+    def repr_dict(self, x, level):
+        # In iteration order: Repr sorts every key first.
+        if not x:
+            return '{}'
+        if level <= 0:
+            return '{...}'
+        pieces = ['%s: %s' % (self.repr1(key, level - 1), self.repr1(x[key], level - 1))
+                  for key in islice(x, self.maxdict)]
+        if len(x) > self.maxdict:
+            pieces.append('...')
+        return '{%s}' % ', '.join(pieces)
+
+_target_repr = _TargetRepr()
+_target_repr.maxlevel = 4
+_target_repr.maxtuple = _target_repr.maxlist = 20
+_target_repr.maxset = _target_repr.maxfrozenset = 20
+_target_repr.maxdict = 10
+_target_repr.maxstring = _target_repr.maxother = 60
+
+def describe(target):
+    """Short string description of a value for error messages."""
+    if isinstance(target, basestring):
+        text = target
+    elif isinstance(target, _CONTAINERS):
+        text = _target_repr.repr(target)
+    else:
+        text = str(target).replace('\n', ' ')
+    if len(text) > MAX_TARGET_LENGTH:
+        text = text[:MAX_TARGET_LENGTH - 3] + '...'
+    return text
 
 class PySignatureError(Exception):
     """Main exception for the PySignature project."""
@@ -12,22 +66,76 @@ class PySignatureError(Exception):
 
 class TypeAssertionError(PySignatureError, AssertionError):
     """Assertion for specifying a failed type assertion."""
-    def __init__(self, assertion, target):
-        message = "Type assertion failed: '%s' is not a %s" % (target, repr(assertion))
-        super(TypeAssertionError, self).__init__(message)
+    # Sampling mode used by the container that failed, if any.
+    strategy = None
+    # Every failure found by a Record, each one with its path.
+    failures = ()
+
+    def __init__(self, assertion, target, path=None):
+        super(TypeAssertionError, self).__init__(assertion, target, path)
+        self.assertion = assertion
+        self.target = target
+        self.path = path
+
+    def __str__(self):
+        location = ' at %s' % self.path if self.path is not None else ''
+        return "Type assertion failed%s: '%s' is not a %s" % (
+            location, describe(self.target), repr(self.assertion))
 
 class BadTypeSpecError(PySignatureError):
     """Exception that represents that the type signature was
     inconsistently formed."""
     pass
 
+class BudgetExceededError(PySignatureError):
+    """Exception raised when typechecking a call exceeds
+    the limits of its signature (see pysignature.budget)."""
+    def __init__(self, reason):
+        super(BudgetExceededError, self).__init__(reason)
+        self.reason = reason
+
+    def __str__(self):
+        return 'Typecheck budget exceeded: %s' % self.reason
+
 class FunctionTypeCheckError(PySignatureError):
     """Exception that represents a failure to typecheck
     the call to a function.
     """
     def __init__(self, fn, errors):
-        name = fn.__name__
-        amount = len(errors)
+        super(FunctionTypeCheckError, self).__init__(fn, errors)
+        self.fn = fn
         self.errors = errors
-        message = "Failed to typecheck function '%s': error in %i argument(s)" % (name, amount)
-        super(FunctionTypeCheckError, self).__init__(message)
+
+    def __reduce__(self):
+        # The untyped function cannot be pickled by name, as
+        # its module attribute is the typechecked wrapper.
+        return (_function_error, (self.__class__, self.fn.__module__,
+                                  self.fn.__name__, self.errors))
+
+    def __str__(self):
+        name = self.fn.__name__
+        amount = len(self.errors)
+        return "Failed to typecheck function '%s': error in %i argument(s)" % (name, amount)
+
+class OutputTypeCheckError(FunctionTypeCheckError):
+    """Exception that represents a failure to typecheck
+    the value returned (or yielded) by a function, as
+    opposed to its arguments.
+    """
+    def __str__(self):
+        name = self.fn.__name__
+        return "Failed to typecheck function '%s': invalid %s" % (name, self.errors[0].arg.lower())
+
+class _FunctionName(object):
+    """Stand-in for a function that cannot be found."""
+    def __init__(self, module, name):
+        self.__module__ = module
+        self.__name__ = name
+
+def _function_error(cls, module, name, errors):
+    """Unpickle a FunctionTypeCheckError, finding its
+    function by name (through its typechecked wrapper)."""
+    fn = getattr(sys.modules.get(module), name, None)
+    if fn is None:
+        fn = _FunctionName(module, name)
+    return cls(getattr(fn, 'untyped', fn), errors)
@@ -0,0 +1,64 @@
+"""Validation of very large containers in chunks,
+on a pool of threads or processes.
+
+Container assertions (List, Set and Dictionary)
+given an executor in their `parallel` option split
+their elements in chunks of `chunk_size` and check
+every chunk as a separate task:
+
+    pool = multiprocessing.Pool(32)
+    List(Tuple(String, Numeric), parallel=pool)
+
+The executor may be a multiprocessing pool (threads or
+processes) or anything with a `map` that returns the
+results in order, such as the executors of the
+`futures` package. Processes need the element
+assertion to be picklable, and pay off for expensive
+pure Python assertions; threads only help with
+callables that release the GIL.
+
+Chunks are reported in order, so the failure of the
+first failing chunk is always the one reported, and
+once it is found the chunks not started yet are
+skipped (in thread pools; processes cannot see it).
+"""
+import itertools
+from pysignature.exceptions import TypeAssertionError
+
+DEFAULT_CHUNK_SIZE = 10000
+
+_jobs = itertools.count()
+_cancelled = set()
+
+def check_chunk(task):
+    """Check a chunk of elements, in a worker. Returns
+    the index of its first failing element, or None."""
+    from pysignature.types import compile_assertion
+    job, offset, assertion, items, catch = task
+    if job in _cancelled:
+        return None
+    checker = compile_assertion(assertion)
+    for idx, item in enumerate(items):
+        try:
+            checker(item)
+        except catch:
+            return offset + idx
+    return None
+
+def first_failure(executor, assertion, items, chunk_size, catch=TypeAssertionError):
+    """Index of the first element of the sequence items
+    that fails the assertion (None if they all pass),
+    checking chunks of chunk_size elements on the executor.
+    Exceptions other than catch are raised as they are."""
+    job = next(_jobs)
+    tasks = ((job, start, assertion, items[start:start + chunk_size], catch)
+             for start in xrange(0, len(items), chunk_size))
+    mapper = getattr(executor, 'imap', None) or executor.map
+    try:
+        for failure in mapper(check_chunk, tasks):
+            if failure is not None:
+                return failure
+        return None
+    finally:
+        _cancelled.add(job)
+        _cancelled.discard(job - 1000)
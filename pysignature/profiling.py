@@ -0,0 +1,180 @@
+"""Profiling of the time spent in each node of
+the assertion trees of typechecked functions.
+
+Signatures created with the `_profile` option can
+have their checks profiled, on a fraction of the
+calls, while profiling is started:
+
+    profiling.start(rate=0.01)
+    ...
+    print profiling.report(10)
+    profiling.stop()
+
+Profiled calls use a second compilation of the type
+spec, in which every assertion (nested ones included)
+records its calls, total time and self time (without
+its nested assertions) under its stack: the function,
+the argument and the reprs of the enclosing assertions.
+The rest of the calls use the regular check functions,
+so only the sampled ones pay for the measurements. The
+budget of the signature (see pysignature.budget), if
+any, applies to both.
+
+`collapsed` writes the stacks in the collapsed format
+read by flame graph tools (self time in microseconds).
+Return and yielded values are not profiled. A Record
+is a single node: the Records, Lists, Dictionaries and
+Tuples it walks by itself have no node of their own,
+so their time counts as self time of the Record, and
+their leaf assertions are nested right under it.
+"""
+import random
+import threading
+import timeit
+import weakref
+from pysignature.types import assertion_name, instrumented
+
+timer = timeit.default_timer
+
+_rate = 0.0
+_registry = weakref.WeakSet()
+_building = threading.Lock()
+
+def start(rate=1.0):
+    """Profile the given fraction of the calls of
+    every signature with the `_profile` option."""
+    global _rate
+    _rate = rate
+
+def stop():
+    global _rate
+    _rate = 0.0
+
+def sampled():
+    """Whether the current call should be profiled."""
+    rate = _rate
+    return rate > 0 and (rate >= 1 or random.random() < rate)
+
+class SignatureProfile(object):
+    """Profile of the assertions of a single signature."""
+    def __init__(self, signature):
+        fn = signature.fn
+        self.name = '%s.%s' % (fn.__module__, fn.__name__)
+        self.signature = signature
+        self.state = threading.local()
+        self._instrumented = None
+        # Stack (tuple of names) -> [calls, total time, self time]
+        self.nodes = {}
+
+    def reset(self):
+        self.nodes.clear()
+
+    def instrumented(self):
+        """Copy of the signature whose check functions
+        record their time in this profile."""
+        if self._instrumented is None:
+            with _building:
+                if self._instrumented is None:
+                    self._instrumented = self._instrument()
+        return self._instrumented
+
+    def _instrument(self):
+        original = self.signature
+        profiled = original.__class__.__new__(original.__class__)
+        profiled.__dict__.update(original.__dict__)
+        profiled.type_spec = dict(original.type_spec)
+        budget = original.budget
+        def hook(assertion, checker):
+            if budget is not None:
+                checker = budget(assertion, checker)
+            return self.frame(_name(assertion), checker)
+        if budget is not None:
+            hook.visit = budget.visit
+            hook.ticks = budget.ticks
+        with instrumented(hook):
+            checkers = profiled.compile_spec()
+        for arg, checker in checkers.items():
+            checkers[arg] = self.frame(arg, checker)
+        profiled.returns = checkers.pop('_returns', None)
+        profiled.yields = checkers.pop('_yields', None)
+        profiled.checkers = checkers
+        profiled.defaults = {}
+        profiled.bind_plan()
+        profiled.defaults = original.defaults
+        profiled.default_errors = original.default_errors
+        return profiled
+
+    def frame(self, name, checker):
+        """Wrap a check function so that its calls are
+        recorded under the current stack plus name."""
+        state = self.state
+        nodes = self.nodes
+        def check(value):
+            parent = getattr(state, 'stack', ())
+            stack = state.stack = parent + (name,)
+            children = getattr(state, 'children', None)
+            if children is None:
+                children = state.children = []
+            children.append(0.0)
+            start = timer()
+            try:
+                return checker(value)
+            finally:
+                elapsed = timer() - start
+                nested = children.pop()
+                if children:
+                    children[-1] += elapsed
+                state.stack = parent
+                node = nodes.get(stack)
+                if node is None:
+                    node = nodes.setdefault(stack, [0, 0.0, 0.0])
+                node[0] += 1
+                node[1] += elapsed
+                node[2] += elapsed - nested
+        return check
+
+def _name(assertion):
+    try:
+        name = assertion_name(assertion)
+    except AttributeError:
+        name = repr(assertion)
+    return name.replace(';', ',')
+
+def register(profile):
+    """Make the profile visible to the reports."""
+    _registry.add(profile)
+
+def reset():
+    """Clear every registered profile."""
+    for profile in list(_registry):
+        profile.reset()
+
+def _stacks():
+    """(full stack, calls, total, self time) of every node."""
+    for profile in sorted(_registry, key=lambda profile: profile.name):
+        for stack, (calls, total, own) in profile.nodes.items():
+            yield (profile.name,) + stack, calls, total, own
+
+def collapsed():
+    """Every profiled stack in the collapsed stack format,
+    one per line, with its self time in microseconds."""
+    lines = []
+    for stack, _, _, own in sorted(_stacks()):
+        micros = int(round(own * 1e6))
+        if micros > 0:
+            lines.append('%s %i' % (';'.join(stack), micros))
+    return '\n'.join(lines)
+
+def top(n=10):
+    """The n nodes with the most self time, as
+    (stack, calls, total time, self time) tuples,
+    the stack being a string like the collapsed ones."""
+    nodes = sorted(_stacks(), key=lambda node: node[3], reverse=True)[:n]
+    return [(';'.join(stack), calls, total, own) for stack, calls, total, own in nodes]
+
+def report(n=10):
+    """Text table with the top n nodes."""
+    lines = ['%10s %12s %12s  %s' % ('calls', 'total (s)', 'self (s)', 'assertion')]
+    for stack, calls, total, own in top(n):
+        lines.append('%10i %12.6f %12.6f  %s' % (calls, total, own, stack))
+    return '\n'.join(lines)
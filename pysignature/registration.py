@@ -0,0 +1,70 @@
+"""Typechecking many functions at once, from a
+single place, with their Signatures built lazily.
+
+A class decorator applies a type_spec per method:
+
+    @typechecked_methods(
+        get=dict(key=String),
+        put=dict(key=String, value=Numeric),
+    )
+    class Store(object):
+        ...
+
+and typecheck_module does the same for the functions
+of a module, usually at its end:
+
+    typecheck_module(__name__,
+        parse=dict(payload=Dictionary(String, Any)),
+        render=dict(template=String),
+    )
+
+Nothing but the wrappers is created until a function
+is first called; pysignature.signature.warm_all builds
+every pending Signature at once (and raises the first
+BadTypeSpecError, which is what tests want).
+"""
+import sys
+from inspect import isfunction
+from pysignature.exceptions import BadTypeSpecError
+from pysignature.signature import lazy_typechecked
+
+def typechecked_methods(**specs):
+    """Class decorator that lazily typechecks the
+    methods named by its arguments, each with its own
+    type_spec dictionary. Static and class methods are
+    supported."""
+    def decorator(cls):
+        for name, type_spec in specs.iteritems():
+            member = vars(cls).get(name)
+            kind = type(member) if isinstance(member, (staticmethod, classmethod)) else None
+            fn = member.__func__ if kind is not None else member
+            if not isfunction(fn):
+                raise BadTypeSpecError('%s has no method %s' % (cls.__name__, name))
+            replace = _replacer(cls, name, kind)
+            wrapper = lazy_typechecked(fn, type_spec, replace)
+            setattr(cls, name, kind(wrapper) if kind is not None else wrapper)
+        return cls
+    return decorator
+
+def typecheck_module(module, **specs):
+    """Lazily typecheck the functions of a module (given
+    by name or as a module object) named by the arguments,
+    each with its own type_spec dictionary."""
+    if isinstance(module, basestring):
+        module = sys.modules[module]
+    for name, type_spec in specs.iteritems():
+        fn = getattr(module, name, None)
+        if not isfunction(fn):
+            raise BadTypeSpecError('%s has no function %s' % (module.__name__, name))
+        setattr(module, name, lazy_typechecked(fn, type_spec, _replacer(module, name)))
+
+def _replacer(owner, name, kind=None):
+    """Function that installs the regular wrapper of a
+    lazy one on its owner, if it was not replaced yet."""
+    def replace(wrapper):
+        current = vars(owner).get(name)
+        if kind is not None:
+            current = getattr(current, '__func__', None)
+        if getattr(current, 'untyped', None) is wrapper.untyped:
+            setattr(owner, name, kind(wrapper) if kind is not None else wrapper)
+    return replace
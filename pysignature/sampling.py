@@ -0,0 +1,111 @@
+"""Strategies for deciding which elements of
+a container get checked.
+
+Container assertions (List, Set and Dictionary)
+check every element by default. Given a strategy
+in their `sample` option they only check the
+elements it selects:
+
+    List(Numeric, sample=FirstK(100))
+
+Every strategy counts how many validations used
+each mode in its `counts` property, and a failed
+assertion carries the mode in its `strategy`
+attribute.
+"""
+import random
+from itertools import islice
+
+class Strategy(object):
+    """Base class for sampling strategies."""
+    def __init__(self):
+        self.counts = {}
+
+    def select(self, container):
+        """Return the name of the mode used and an
+        iterable with the elements to check (keys for
+        dictionaries)."""
+        raise NotImplementedError
+
+    def record(self, mode, passed):
+        """Called after each validation with the mode
+        returned by select and its outcome."""
+        self.counts[mode] = self.counts.get(mode, 0) + 1
+
+    def __repr__(self):
+        return self.__class__.__name__ + '()'
+
+class Full(Strategy):
+    """Check every element."""
+    def select(self, container):
+        return 'full', container
+
+class FirstK(Strategy):
+    """Only check the first k elements
+    in iteration order."""
+    def __init__(self, k):
+        super(FirstK, self).__init__()
+        self.k = k
+
+    def select(self, container):
+        if len(container) <= self.k:
+            return 'full', container
+        return 'first', islice(container, self.k)
+
+    def __repr__(self):
+        return 'FirstK(%i)' % self.k
+
+class RandomK(Strategy):
+    """Check k elements chosen at random."""
+    def __init__(self, k):
+        super(RandomK, self).__init__()
+        self.k = k
+
+    def select(self, container):
+        if len(container) <= self.k:
+            return 'full', container
+        return 'random', random.sample(_population(container), self.k)
+
+    def __repr__(self):
+        return 'RandomK(%i)' % self.k
+
+class Adaptive(Strategy):
+    """Check every element until `after` consecutive
+    validations pass, then only check a random `rate`
+    fraction of the elements (at least `minimum` of
+    them). The first failure goes back to full checks.
+
+    The state is kept in the strategy itself, so each
+    assertion (call site) should get its own instance.
+    """
+    def __init__(self, after=100, rate=0.01, minimum=10):
+        super(Adaptive, self).__init__()
+        self.after = after
+        self.rate = rate
+        self.minimum = minimum
+        self.clean = 0
+
+    def select(self, container):
+        size = len(container)
+        k = max(self.minimum, int(size * self.rate))
+        if self.clean < self.after or size <= k:
+            return 'full', container
+        return 'random', random.sample(_population(container), k)
+
+    def record(self, mode, passed):
+        super(Adaptive, self).record(mode, passed)
+        if not passed:
+            self.clean = 0
+        elif mode == 'full':
+            self.clean += 1
+
+    def __repr__(self):
+        return 'Adaptive(after=%i, rate=%s)' % (self.after, self.rate)
+
+def _population(container):
+    """Something random.sample accepts."""
+    if isinstance(container, dict):
+        return container.keys()
+    elif isinstance(container, (set, frozenset)):
+        return tuple(container)
+    return container
@@ -2,12 +2,47 @@
 
 import functools
 import inspect
+import pickle
+import random
+import sys
+import threading
+import weakref
+from itertools import izip
 from collections import namedtuple
 from pysignature.exceptions import (
     BadTypeSpecError, TypeAssertionError,
-    FunctionTypeCheckError
+    FunctionTypeCheckError, OutputTypeCheckError
 )
 import pysignature.types as t
+from pysignature import stats
+from pysignature import switch
+from pysignature import profiling
+from pysignature.budget import Budget
+
+OPTIONS = {
+    '_cache_immutables': False,
+    '_stats': False,
+    '_mode': 'collect',
+    '_max_errors': None,
+    '_executor': None,
+    '_chunk_size': None,
+    '_output_rate': 1.0,
+    '_lazy': False,
+    '_profile': False,
+    '_max_elements': None,
+    '_max_depth': None,
+    '_deadline': None,
+}
+
+OUTPUTS = ('_returns', '_yields')
+
+BUDGETS = ('_max_elements', '_max_depth', '_deadline')
+
+MODES = ('collect', 'fail_fast')
+
+IMMUTABLE_TYPES = frozenset([
+    type(None), bool, int, long, float, complex, str, unicode
+])
 
 class Signature(object):
     """Encapsulate the logic of handling
@@ -20,11 +55,85 @@ class Signature(object):
         Signature object.
         """
         argspec = inspect.getargspec(fn)
+        self.arg_names = argspec.args
         self.varargs_name = argspec.varargs
         self.kwargs_name = argspec.keywords
-        self.type_spec = type_spec
+        self.defaults = dict(zip(reversed(argspec.args),
+                                 reversed(argspec.defaults or ())))
+        self.options = dict(OPTIONS)
+        self.type_spec = {}
+        for key, value in type_spec.iteritems():
+            if key in OPTIONS:
+                self.options[key] = value
+            else:
+                self.type_spec[key] = value
         self.fn = fn
         self.validate_spec()
+        self.build()
+
+    def build(self):
+        """Compile the validated type_spec and prepare
+        everything needed to check calls."""
+        fn = self.fn
+        self.max_errors = 1 if self.options['_mode'] == 'fail_fast' else self.options['_max_errors']
+        self.budget = None
+        if any(self.options[limit] is not None for limit in BUDGETS):
+            self.budget = Budget(self.options['_max_elements'], self.options['_max_depth'],
+                                 self.options['_deadline'])
+            with t.instrumented(self.budget):
+                self.checkers = self.compile_spec()
+            self.budget.start()
+        else:
+            self.checkers = self.compile_spec()
+        self.returns = self.checkers.pop('_returns', None)
+        self.yields = self.checkers.pop('_yields', None)
+        if self.budget is not None:
+            self.returns = self.returns and self.budget.rooted(self.returns)
+            self.yields = self.yields and self.budget.rooted(self.yields)
+        self.output_rate = self.options['_output_rate']
+        self.wrapped_outputs = frozenset(output for output in OUTPUTS
+                                         if getattr(self.type_spec.get(output), 'wraps', False))
+        self.bind_plan()
+        self.stats = None
+        self.check = self.typecheck
+        if self.options['_stats']:
+            self.stats = stats.SignatureStats(fn)
+            stats.register(self.stats)
+            self.check = self.typecheck_with_stats
+        self.profile = None
+        if self.options['_profile']:
+            self.profile = profiling.SignatureProfile(self)
+            profiling.register(self.profile)
+            self.check = self.typecheck_with_profile
+        if self.budget is not None:
+            self._unbudgeted = self.check
+            self.check = self.typecheck_with_budget
+
+    def __getstate__(self):
+        """Picklable state of the signature: a reference to
+        the function (its module and name), its argument
+        spec and the validated type_spec and options. Options
+        that only make sense in this process (the executor)
+        are dropped, and check functions are compiled again
+        when the state is restored."""
+        options = dict(self.options)
+        options['_executor'] = None
+        return {
+            'fn': _reference(self.fn),
+            'arg_names': self.arg_names,
+            'varargs_name': self.varargs_name,
+            'kwargs_name': self.kwargs_name,
+            'defaults': self.defaults,
+            'options': options,
+            'type_spec': self.type_spec,
+        }
+
+    def __setstate__(self, state):
+        state = dict(state)
+        fn = _resolve(state.pop('fn'))
+        self.__dict__.update(state)
+        self.fn = fn
+        self.build()
 
     def validate_spec(self):
         """Verify that the given typespec
@@ -41,51 +150,379 @@ class Signature(object):
             raise BadTypeSpecError('No type specified for keyword arguments')
         elif (self.kwargs_name is None) and specifies_named:
             raise BadTypeSpecError('Function does not support keyword arguments')
+        elif not all(isinstance(arg, str) for arg in self.arg_names):
+            raise BadTypeSpecError('Tuple parameters are not supported')
+        elif '_yields' in self.type_spec and not inspect.isgeneratorfunction(self.fn):
+            raise BadTypeSpecError('Function is not a generator')
+        elif '_returns' in self.type_spec and inspect.isgeneratorfunction(self.fn):
+            raise BadTypeSpecError('Generator functions are checked with _yields')
+        elif self.options['_mode'] not in MODES:
+            raise BadTypeSpecError('Unknown mode: %r' % (self.options['_mode'],))
+        elif self.options['_max_errors'] is not None and self.options['_max_errors'] < 1:
+            raise BadTypeSpecError('The maximum amount of errors must be positive')
+        elif not 0 <= self.options['_output_rate'] <= 1:
+            raise BadTypeSpecError('The output rate must be between 0 and 1')
+        elif any(self.options[limit] is not None and not self.options[limit] > 0
+                 for limit in BUDGETS):
+            raise BadTypeSpecError('Budget limits must be positive')
+
+    def compile_spec(self):
+        """Compile every entry of the type_spec
+        into its check function.
+
+        With an '_executor' option, the outermost
+        containers of the spec are checked in parallel
+        (unless they have their own executor).
+        """
+        executor = self.options['_executor']
+        if executor is not None:
+            parallel_options = {'parallel': executor}
+            if self.options['_chunk_size'] is not None:
+                parallel_options['chunk_size'] = self.options['_chunk_size']
+            for arg, assertion in self.type_spec.items():
+                if (isinstance(assertion, (t.List, t.Set, t.Dictionary)) and
+                        'parallel' not in assertion.options):
+                    self.type_spec[arg] = assertion.with_options(**parallel_options)
+        checkers = dict((arg, t.compile_assertion(assertion))
+                        for arg, assertion in self.type_spec.iteritems())
+        cache_size = self.options['_cache_immutables']
+        if cache_size:
+            if cache_size is True:
+                cache_size = 1024
+            for arg, checker in checkers.items():
+                if not getattr(self.type_spec[arg], 'wraps', False):
+                    checkers[arg] = _cached(checker, cache_size)
+        return checkers
+
+    def bind_plan(self):
+        """Precompute how call arguments map to
+        check functions, so that typecheck can bind
+        positional arguments by index and keyword
+        arguments by name without inspecting the
+        function again.
+
+        Arguments without an entry in the type_spec
+        are bound but not checked. Default values are
+        checked here, once; an omitted argument is only
+        reported if its default failed this check. Other
+        exceptions raised by the check of a default are
+        raised again when its argument is omitted.
+        """
+        self.arity = len(self.arg_names)
+        self.positional = [(arg, self.checkers.get(arg)) for arg in self.arg_names]
+        self.by_name = dict((arg, (idx, self.checkers.get(arg)))
+                            for idx, arg in enumerate(self.arg_names))
+        self.wrapping = dict((arg, self.checkers[arg]) for arg, assertion
+                             in self.type_spec.iteritems()
+                             if arg not in OUTPUTS and getattr(assertion, 'wraps', False))
+        self.default_errors = {}
+        for arg, value in self.defaults.iteritems():
+            checker = self.checkers.get(arg)
+            if checker is not None:
+                try:
+                    checker(value)
+                except Exception as e:
+                    self.default_errors[arg] = TypeArgumentError(arg, e)
 
     def typecheck(self, *args, **kwargs):
         """Use the original type specification
         for validating the given types.
+
+        Every argument is checked and all of the
+        failures are reported, unless the signature
+        has a maximum amount of errors (or the
+        'fail_fast' mode), in which case it stops as
+        soon as that many arguments failed.
         """
-        callargs = inspect.getcallargs(self.fn, *args, **kwargs)
+        given = len(args)
+        if given > self.arity and self.varargs_name is None:
+            self._raise_call_error(args, kwargs)
+        # Calls that cannot be bound fail the same way
+        # whatever the mode, before any argument is checked.
+        for key in kwargs:
+            idx, _ = self.by_name.get(key, (None, None))
+            if idx is None:
+                if self.kwargs_name is None:
+                    self._raise_call_error(args, kwargs)
+            elif idx < given:
+                self._raise_call_error(args, kwargs)
+        omitted = [arg for arg, _ in self.positional[given:] if arg not in kwargs]
+        for arg in omitted:
+            if arg not in self.defaults:
+                self._raise_call_error(args, kwargs)
+
         errors = []
-        for arg, value in callargs.iteritems():
-            if arg == self.varargs_name:
-                errors.extend(self._typecheck_varargs(arg, value))
-            elif arg == self.kwargs_name:
-                errors.extend(self._typecheck_kwargs(arg, value))
+        for (arg, checker), value in izip(self.positional, args):
+            if checker is not None:
+                try:
+                    checker(value)
+                except TypeAssertionError as e:
+                    self._add_error(errors, TypeArgumentError(arg, e))
+        if given > self.arity:
+            self._typecheck_varargs(args[self.arity:], errors)
+
+        for key, value in kwargs.iteritems():
+            idx, checker = self.by_name.get(key, (None, None))
+            if idx is None:
+                checker = self.checkers['_named']
+                msg = "Keyword argument '%s'" % key
             else:
+                msg = key
+            if checker is not None:
                 try:
-                    t.assert_type(value, self.type_spec[arg])
+                    checker(value)
                 except TypeAssertionError as e:
-                    errors.append(TypeArgumentError(arg, str(e)))
+                    self._add_error(errors, TypeArgumentError(msg, e))
+
+        for arg in omitted:
+            if arg in self.default_errors:
+                error = self.default_errors[arg]
+                if not isinstance(error.exception, TypeAssertionError):
+                    raise error.exception
+                self._add_error(errors, error)
+
         if len(errors) > 0:
             raise FunctionTypeCheckError(self.fn, errors)
 
-    def _typecheck_varargs(self, arg, value):
-        errors = []
+    def typecheck_with_stats(self, *args, **kwargs):
+        """Same as typecheck, recording the call in
+        the stats of this signature."""
+        start = stats.timer()
+        try:
+            self.typecheck(*args, **kwargs)
+        except FunctionTypeCheckError as e:
+            self.stats.record(stats.timer() - start, e.errors)
+            raise
+        self.stats.record(stats.timer() - start)
+
+    def typecheck_with_profile(self, *args, **kwargs):
+        """Same as typecheck (or typecheck_with_stats),
+        using the instrumented check functions of the
+        profile in the calls sampled by pysignature.profiling."""
+        target = self.profile.instrumented() if profiling.sampled() else self
+        if self.stats is not None:
+            target.typecheck_with_stats(*args, **kwargs)
+        else:
+            target.typecheck(*args, **kwargs)
+
+    def typecheck_with_budget(self, *args, **kwargs):
+        """Same as typecheck (with stats or profile, if
+        enabled), accounting the call in the budget of
+        this signature. Exceeding it raises a
+        BudgetExceededError as soon as it happens."""
+        self.budget.start()
+        self._unbudgeted(*args, **kwargs)
+
+    def check_many(self, rows):
+        """Typecheck many calls at once, each one given
+        as a dictionary of keyword arguments (a row).
 
-        for idx, item in enumerate(value):
+        Arguments are checked column-wise: the values of
+        an argument in every row, in a single pass that
+        skips the types known to always pass. Returns a
+        BatchResult instead of raising for invalid rows:
+        any exception of a check is an error of its row.
+        """
+        if not isinstance(rows, (list, tuple)):
+            rows = list(rows)
+        result = BatchResult(len(rows))
+        start = self.budget.start if self.budget is not None else None
+        for arg in self.arg_names:
+            checker = self.checkers.get(arg)
+            has_default = arg in self.defaults
+            if checker is None and has_default:
+                continue
+            elif checker is not None:
+                accepted, learn = t.accepted_types(self.type_spec[arg])
+            default_error = self.default_errors.get(arg)
+            for idx, row in enumerate(rows):
+                value = row.get(arg, _MISSING)
+                if value is _MISSING:
+                    if not has_default:
+                        result.add(idx, TypeArgumentError(arg, TypeError('Missing argument')))
+                    elif default_error is not None:
+                        result.add(idx, default_error)
+                elif checker is not None:
+                    cls = type(value)
+                    if cls in accepted or learn(cls):
+                        continue
+                    if start is not None:
+                        start()
+                    try:
+                        checker(value)
+                    except Exception as e:
+                        # Such as the TypeError of int(None) in a
+                        # Numeric check: it only fails this row.
+                        result.add(idx, TypeArgumentError(arg, e))
+        known = frozenset(self.arg_names)
+        for idx, row in enumerate(rows):
+            if not known.issuperset(row):
+                self._check_many_named(idx, row, known, result)
+        return result
+
+    def _check_many_named(self, idx, row, known, result):
+        """Check the keys of a row that are not named
+        arguments of the function."""
+        checker = self.checkers.get('_named')
+        for key in row:
+            if key in known:
+                continue
+            msg = "Keyword argument '%s'" % key
+            if self.kwargs_name is None:
+                result.add(idx, TypeArgumentError(msg, TypeError('Unexpected argument')))
+                continue
+            if self.budget is not None:
+                self.budget.start()
             try:
-                t.assert_type(item, self.type_spec['_variadic'])
-            except TypeAssertionError as e:
-                msg = 'Variadic argument %i' % idx
-                errors.append(TypeArgumentError(msg, str(e)))
+                checker(row[key])
+            except Exception as e:
+                result.add(idx, TypeArgumentError(msg, e))
 
-        return errors
+    def wrap_arguments(self, args, kwargs):
+        """Replace the arguments whose assertions wrap
+        their values (such as Iterable) by the wrapped
+        values. Must be called after typecheck passed."""
+        args = list(args)
+        for idx, arg in enumerate(self.arg_names[:len(args)]):
+            if arg in self.wrapping:
+                args[idx] = self.wrapping[arg](args[idx])
+        if '_variadic' in self.wrapping:
+            checker = self.wrapping['_variadic']
+            for idx in xrange(self.arity, len(args)):
+                args[idx] = checker(args[idx])
+        for key, value in kwargs.items():
+            if key in self.wrapping:
+                kwargs[key] = self.wrapping[key](value)
+            elif key not in self.by_name and '_named' in self.wrapping:
+                kwargs[key] = self.wrapping['_named'](value)
+        return args, kwargs
 
-    def _typecheck_kwargs(self, arg, value):
-        errors = []
+    def _raise_call_error(self, args, kwargs):
+        """Let inspect produce the same TypeError
+        that calling the function would raise."""
+        inspect.getcallargs(self.fn, *args, **kwargs)
 
-        for key, item in value.iteritems():
+    def sample_output(self):
+        """Whether the output of the current call
+        should be checked, given the output rate."""
+        return self.output_rate >= 1 or random.random() < self.output_rate
+
+    def check_return(self, value):
+        """Check the value returned by the function, and
+        return it (wrapped, for assertions such as Iterable)."""
+        try:
+            checked = self.returns(value)
+        except TypeAssertionError as e:
+            raise OutputTypeCheckError(self.fn, [TypeArgumentError('Return value', e)])
+        return checked if '_returns' in self.wrapped_outputs else value
+
+    def check_yield(self, idx, value):
+        """Check the idx-th value yielded by the function,
+        and return it (wrapped, like check_return)."""
+        try:
+            checked = self.yields(value)
+        except TypeAssertionError as e:
+            msg = 'Yielded value %i' % idx
+            raise OutputTypeCheckError(self.fn, [TypeArgumentError(msg, e)])
+        return checked if '_yields' in self.wrapped_outputs else value
+
+    def _add_error(self, errors, error):
+        """Add an error to the ones found in the
+        current call, stopping if there are enough."""
+        errors.append(error)
+        if self.max_errors is not None and len(errors) >= self.max_errors:
+            raise FunctionTypeCheckError(self.fn, errors)
+
+    def _typecheck_varargs(self, values, errors):
+        checker = self.checkers['_variadic']
+
+        for idx, item in enumerate(values):
             try:
-                t.assert_type(item, self.type_spec['_named'])
+                checker(item)
             except TypeAssertionError as e:
-                msg = "Keyword argument '%s'" % key
-                errors.append(TypeArgumentError(msg, str(e)))
+                msg = 'Variadic argument %i' % idx
+                self._add_error(errors, TypeArgumentError(msg, e))
+
+class TypeArgumentError(namedtuple('TypeArgumentError', ['arg', 'exception'])):
+    """Failure of a single argument: its description and
+    the TypeAssertionError, whose message is only formatted
+    when `error` is read."""
+    __slots__ = ()
+
+    @property
+    def error(self):
+        return str(self.exception)
+
+_MISSING = object()
 
-        return errors
+def _reference(fn):
+    """Module and name under which a function can be
+    found again, possibly as the untyped function of
+    a typechecked wrapper."""
+    try:
+        if _resolve((fn.__module__, fn.__name__)) is fn:
+            return (fn.__module__, fn.__name__)
+    except (ImportError, AttributeError):
+        pass
+    raise pickle.PicklingError("Can't pickle the signature of %r: it is not found as %s.%s"
+                               % (fn, fn.__module__, fn.__name__))
 
-TypeArgumentError = namedtuple('TypeArgumentError', ['arg', 'error'])
+def _resolve(reference):
+    module, name = reference
+    __import__(module)
+    fn = getattr(sys.modules[module], name)
+    return getattr(fn, 'untyped', fn)
+
+class BatchResult(object):
+    """Outcome of Signature.check_many: a bitmap with
+    a set bit for every row that passed (bit i % 8 of
+    byte i / 8) and the errors of every failing row."""
+    def __init__(self, size):
+        self.size = size
+        self.bitmap = bytearray('\xff' * ((size + 7) // 8))
+        if size % 8:
+            self.bitmap[-1] = (1 << (size % 8)) - 1
+        self.errors = {}
+
+    def add(self, idx, error):
+        """Record an error of the row idx."""
+        errors = self.errors.get(idx)
+        if errors is None:
+            errors = self.errors[idx] = []
+            self.bitmap[idx >> 3] &= ~(1 << (idx & 7)) & 0xff
+        errors.append(error)
+
+    def passed(self, idx):
+        return bool(self.bitmap[idx >> 3] >> (idx & 7) & 1)
+
+    def passing(self):
+        """Indexes of the rows that passed."""
+        return [idx for idx in xrange(self.size) if idx not in self.errors]
+
+    def __len__(self):
+        return self.size
+
+def _cached(checker, size):
+    """Wrap a check function so that immutable values
+    that already passed it are not checked again.
+
+    Values are remembered by type and value, so equal
+    constants passed repeatedly (None, small ints, module
+    level strings) hit the cache. At most `size` values
+    are remembered.
+    """
+    passed = set()
+    def check(value):
+        cls = type(value)
+        if cls not in IMMUTABLE_TYPES:
+            checker(value)
+            return
+        key = (cls, value)
+        if key not in passed:
+            checker(value)
+            if len(passed) < size:
+                passed.add(key)
+    return check
 
 def typechecked(**kwargs):
     """Returns a decorator for typechecking functions.
@@ -101,13 +538,210 @@ def typechecked(**kwargs):
     function: '_variadic' and '_named', respectively. A single
     TypeAssertion is given to these especial arguments,
     and each one of their members must pass such assertion.
+
+    Options are also given as keyword arguments:
+    '_cache_immutables' (True or a maximum size) remembers
+    the immutable values (None, numbers, strings) that
+    already passed, so repeated constants are not checked
+    again. '_stats' records the calls in the counters of
+    pysignature.stats. '_mode' is either 'collect' (the
+    default, report every failed argument) or 'fail_fast'
+    (stop at the first one), and '_max_errors' stops after
+    the given amount of failed arguments. '_executor' checks
+    the outermost List, Set and Dictionary assertions in
+    chunks (of '_chunk_size' elements) on the given pool,
+    as described in pysignature.parallel. '_profile'
+    makes the checks profilable with pysignature.profiling.
+    '_max_elements', '_max_depth' and '_deadline' (in
+    seconds) limit the work done to check each call, as
+    described in pysignature.budget.
+
+    The Signature itself is available in the property
+    'signature' of the wrapper, and its check_many method
+    (which checks many calls given as dictionaries of
+    arguments) in 'typecheck_batch'.
+
+    The output of the function is checked when '_returns'
+    (or '_yields', for generator functions) is given. The
+    option '_output_rate' (between 0 and 1) makes it only
+    check the output of that fraction of the calls. Failures
+    raise an OutputTypeCheckError.
+
+    Generator functions (including generator based
+    coroutines) are wrapped by generator functions,
+    which check the arguments when the generator is
+    first resumed, as the wrapped body would only run
+    then, and forward sent values and exceptions.
+
+    Typechecking can be turned off by module with
+    pysignature.switch: disabled modules keep their
+    wrappers, which skip the checks, and elided modules
+    get their functions back without a wrapper.
+
+    With the option '_lazy', the Signature is only built
+    (and the type_spec validated) on the first call, or
+    when warm_all is called; see lazy_typechecked.
     """
     def typecheck_decorator(fn):
+        if kwargs.get('_lazy'):
+            return lazy_typechecked(fn, kwargs)
+        elif switch.is_elided(fn.__module__):
+            return fn
         signature = Signature(fn, kwargs)
-        @functools.wraps(fn)
-        def decorated(*args, **kwargs):
-            signature.typecheck(*args, **kwargs)
-            return fn(*args, **kwargs)
+        module_switch = switch.switch_for(fn.__module__)
+        if inspect.isgeneratorfunction(fn):
+            decorated = _generator_wrapper(fn, signature, module_switch)
+        else:
+            decorated = _function_wrapper(fn, signature, module_switch)
         decorated.untyped = fn
+        decorated.signature = signature
+        decorated.typecheck_batch = signature.check_many
         return decorated
     return typecheck_decorator
+
+_pending = weakref.WeakSet()
+_warming = threading.Lock()
+
+def lazy_typechecked(fn, type_spec, replace=None):
+    """Wrap fn like typechecked(**type_spec) would, but
+    only build its Signature on the first call (or warm).
+
+    The wrapper gets a 'warm' method that builds it and
+    returns it, and its 'signature' is None until then.
+    Once built, the wrapper calls the regular wrapper of
+    the function; replace, if given, receives the regular
+    wrapper at that point, so the owner of the lazy one
+    can call the regular one directly from then on.
+    Without it (as with typechecked(_lazy=True)) every
+    call keeps going through both wrappers.
+
+    Generator functions get a lazy generator function,
+    which checks the arguments like the regular one.
+    """
+    if switch.is_elided(fn.__module__):
+        return fn
+    module_switch = switch.switch_for(fn.__module__)
+    built = []
+
+    if inspect.isgeneratorfunction(fn):
+        decorated = _generator_wrapper(fn, None, module_switch, lambda: warm())
+    else:
+        @functools.wraps(fn)
+        def decorated(*args, **kwargs):
+            if not built:
+                if not module_switch.enabled:
+                    return fn(*args, **kwargs)
+                warm()
+            return built[0](*args, **kwargs)
+
+    def warm():
+        if built:
+            return decorated.signature
+        with _warming:
+            if not built:
+                signature = Signature(fn, type_spec)
+                if inspect.isgeneratorfunction(fn):
+                    wrapper = _generator_wrapper(fn, signature, module_switch)
+                else:
+                    wrapper = _function_wrapper(fn, signature, module_switch)
+                wrapper.untyped = fn
+                wrapper.signature = decorated.signature = signature
+                wrapper.typecheck_batch = signature.check_many
+                built.append(wrapper)
+                _pending.discard(decorated)
+                if replace is not None:
+                    replace(wrapper)
+        return decorated.signature
+
+    decorated.untyped = fn
+    decorated.signature = None
+    decorated.warm = warm
+    decorated.typecheck_batch = lambda rows: warm().check_many(rows)
+    _pending.add(decorated)
+    return decorated
+
+def warm_all(module=None):
+    """Build the Signature of every lazily typechecked
+    function not called yet (in the given module and its
+    submodules, or everywhere). A BadTypeSpecError raised
+    by one of them is reported with the function name,
+    so tests can validate every spec eagerly."""
+    for decorated in sorted(_pending, key=lambda fn: (fn.__module__, fn.__name__)):
+        name = decorated.__module__
+        if module is None or name == module or name.startswith(module + '.'):
+            try:
+                decorated.warm()
+            except BadTypeSpecError as e:
+                raise BadTypeSpecError('%s.%s: %s' % (name, decorated.__name__, e))
+
+def _function_wrapper(fn, signature, switch):
+    check = signature.check
+    if signature.returns is not None:
+        @functools.wraps(fn)
+        def decorated(*args, **kwargs):
+            if not switch.enabled:
+                return fn(*args, **kwargs)
+            check(*args, **kwargs)
+            if signature.wrapping:
+                args, kwargs = signature.wrap_arguments(args, kwargs)
+            result = fn(*args, **kwargs)
+            if signature.sample_output():
+                result = signature.check_return(result)
+            return result
+    elif signature.wrapping:
+        @functools.wraps(fn)
+        def decorated(*args, **kwargs):
+            if switch.enabled:
+                check(*args, **kwargs)
+                args, kwargs = signature.wrap_arguments(args, kwargs)
+            return fn(*args, **kwargs)
+    else:
+        @functools.wraps(fn)
+        def decorated(*args, **kwargs):
+            if switch.enabled:
+                check(*args, **kwargs)
+            return fn(*args, **kwargs)
+    return decorated
+
+def _generator_wrapper(fn, signature, switch, resolve=None):
+    """Generator function wrapping fn. With resolve, the
+    signature is None and resolve is called to get it the
+    first time a generator is resumed with checks enabled."""
+    @functools.wraps(fn)
+    def decorated(*args, **kwargs):
+        enabled = switch.enabled
+        check_yields = False
+        if enabled:
+            current = signature if resolve is None else resolve()
+            current.check(*args, **kwargs)
+            if current.wrapping:
+                args, kwargs = current.wrap_arguments(args, kwargs)
+            check_yields = current.yields is not None and current.sample_output()
+        generator = fn(*args, **kwargs)
+        idx = 0
+        try:
+            item = next(generator)
+        except StopIteration:
+            return
+        while True:
+            if check_yields:
+                checked = current.check_yield(idx, item)
+                idx += 1
+            else:
+                checked = item
+            try:
+                sent = yield checked
+            except GeneratorExit:
+                generator.close()
+                raise
+            except BaseException:
+                try:
+                    item = generator.throw(*sys.exc_info())
+                except StopIteration:
+                    return
+            else:
+                try:
+                    item = generator.send(sent)
+                except StopIteration:
+                    return
+    return decorated
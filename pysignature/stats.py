@@ -0,0 +1,99 @@
+"""Runtime statistics of typechecked functions.
+
+Signatures created with the `_stats` option count
+their checked calls, the time spent checking them
+(as a histogram), their failures per argument (extra
+keyword and variadic arguments being accounted under
+'_named' and '_variadic') and per failed assertion.
+The statistics of every such signature can be read
+with `snapshot` and cleared with `reset`.
+
+Signatures without the option are not affected in
+any way by this module.
+"""
+import time
+import weakref
+
+# Histogram buckets are powers of two of microseconds,
+# the last one gathering everything slower.
+BUCKETS = 32
+
+_registry = weakref.WeakSet()
+
+class SignatureStats(object):
+    """Counters of a single signature."""
+    def __init__(self, fn):
+        self.name = '%s.%s' % (fn.__module__, fn.__name__)
+        self.reset()
+
+    def reset(self):
+        self.calls = 0
+        self.failures = 0
+        self.time = 0.0
+        self.histogram = [0] * BUCKETS
+        self.argument_failures = {}
+        self.assertion_failures = {}
+
+    def record(self, elapsed, errors=None):
+        """Account a checked call that took elapsed
+        seconds and failed with the given errors."""
+        self.calls += 1
+        self.time += elapsed
+        self.histogram[min(int(elapsed * 1e6).bit_length(), BUCKETS - 1)] += 1
+        if errors:
+            self.failures += 1
+            for error in errors:
+                arg = parameter(error.arg)
+                self.argument_failures[arg] = self.argument_failures.get(arg, 0) + 1
+                assertion = repr(getattr(error.exception, 'assertion', None))
+                self.assertion_failures[assertion] = self.assertion_failures.get(assertion, 0) + 1
+
+    def snapshot(self):
+        """Copy of the counters as plain values. The
+        histogram maps the upper bound of each bucket,
+        in microseconds, to its amount of calls."""
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'time': self.time,
+            'histogram': dict((2 ** idx, count) for idx, count in enumerate(self.histogram)
+                              if count),
+            'argument_failures': dict(self.argument_failures),
+            'assertion_failures': dict(self.assertion_failures),
+        }
+
+def parameter(arg):
+    """Declared parameter of a failed argument: extra
+    keyword and variadic arguments are accounted under
+    '_named' and '_variadic', so the keys do not depend
+    on the names or amount of arguments of the calls."""
+    if arg.startswith('Keyword argument '):
+        return '_named'
+    elif arg.startswith('Variadic argument '):
+        return '_variadic'
+    return arg
+
+def register(stats):
+    """Make the stats visible to snapshot and reset."""
+    _registry.add(stats)
+
+def snapshot():
+    """Statistics of every registered signature, by
+    the qualified name of its function (functions with
+    the same name get a '#n' suffix)."""
+    result = {}
+    for stats in sorted(_registry, key=lambda stats: stats.name):
+        name = stats.name
+        count = 1
+        while name in result:
+            count += 1
+            name = '%s#%i' % (stats.name, count)
+        result[name] = stats.snapshot()
+    return result
+
+def reset():
+    """Clear the statistics of every registered signature."""
+    for stats in list(_registry):
+        stats.reset()
+
+timer = time.time
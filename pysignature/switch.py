@@ -0,0 +1,101 @@
+"""Switches for turning typechecking off, for
+the whole process or for some modules (a module
+name also covers its submodules).
+
+There are two of them:
+
+* disable/enable act at runtime: the wrappers
+  of the affected functions, including the ones
+  that already exist, call the original function
+  without checking anything until re-enabled.
+* elide/unelide act when functions are decorated:
+  typechecked returns the affected functions as
+  they are, without any wrapper, so they cost
+  nothing but can never be checked.
+
+Their initial state can be given with the
+environment variables PYSIGNATURE_DISABLE and
+PYSIGNATURE_ELIDE, as comma separated module
+names, or '*' for every module.
+"""
+import os
+
+ALL = '*'
+
+_disabled = set()
+_elided = set()
+_switches = {}
+
+class Switch(object):
+    """Runtime state shared by the wrappers of
+    the functions of a module."""
+    __slots__ = ('module', 'enabled')
+
+    def __init__(self, module):
+        self.module = module
+        self.refresh()
+
+    def refresh(self):
+        self.enabled = not _covered(self.module, _disabled)
+
+def switch_for(module):
+    """The Switch of a module."""
+    try:
+        return _switches[module]
+    except KeyError:
+        return _switches.setdefault(module, Switch(module))
+
+def disable(module=None):
+    """Stop checking the functions of a module
+    (or every function, if no module is given)."""
+    _disabled.add(module or ALL)
+    _refresh()
+
+def enable(module=None):
+    """Undo disable for a module and its submodules
+    (or for everything, if no module is given)."""
+    _discard(_disabled, module)
+    _refresh()
+
+def is_enabled(module):
+    return not _covered(module, _disabled)
+
+def elide(module=None):
+    """Make typechecked return the functions of a
+    module (or every function) without a wrapper."""
+    _elided.add(module or ALL)
+
+def unelide(module=None):
+    """Undo elide for a module and its submodules
+    (or for everything, if no module is given)."""
+    _discard(_elided, module)
+
+def is_elided(module):
+    return _covered(module, _elided)
+
+def _covered(module, names):
+    if not names:
+        return False
+    elif ALL in names or module in names:
+        return True
+    parts = module.split('.')
+    return any('.'.join(parts[:idx]) in names for idx in xrange(1, len(parts)))
+
+def _discard(names, module):
+    if module is None:
+        names.clear()
+    else:
+        for name in list(names):
+            if name == module or name.startswith(module + '.'):
+                names.discard(name)
+
+def _refresh():
+    for switch in _switches.values():
+        switch.refresh()
+
+def _from_environment(variable):
+    value = os.environ.get(variable, '')
+    return set(name.strip() for name in value.split(',') if name.strip())
+
+_disabled.update(_from_environment('PYSIGNATURE_DISABLE'))
+_elided.update(_from_environment('PYSIGNATURE_ELIDE'))
@@ -0,0 +1,78 @@
+import pytest
+from array import array
+
+numpy = pytest.importorskip('numpy')
+
+from pysignature import exceptions
+from pysignature import typechecked
+from pysignature.types import Array, List, Numeric, Or, String, assert_type
+
+def test_array_assertion_success():
+    assert assert_type(numpy.zeros(3), Array()) is None
+    assert assert_type(numpy.zeros(3), Array(dtype=float, ndim=1)) is None
+    assert assert_type(numpy.zeros((2, 3)), Array(shape=(2, None))) is None
+    assert assert_type(numpy.arange(5, dtype='int32'), Array(dtype=Numeric)) is None
+    assert assert_type(numpy.arange(5), Array(dtype=numpy.integer, min=0, max=4)) is None
+
+def test_array_assertion_failure_for_non_arrays():
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type([1.0, 2.0], Array(dtype=float))
+    assert "'[1.0, 2.0]' is not a Array(dtype=float)" in str(error)
+
+def test_array_assertion_failure_for_dtype_and_shape():
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(numpy.zeros(3, dtype='float32'), Array(dtype='float64'))
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(numpy.array(['a']), Array(dtype=Numeric))
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(numpy.zeros((2, 3)), Array(ndim=1))
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type(numpy.zeros((2, 3)), Array(shape=(2, 4)))
+    assert "is not a Array(shape=(2, 4))" in str(error)
+
+def test_array_assertion_failure_for_values():
+    values = numpy.array([1.0, numpy.nan, 3.0])
+    assert assert_type(values, Array(dtype=float)) is None
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(values, Array(finite=True))
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(values, Array(min=0))
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(numpy.arange(10), Array(max=5))
+    assert assert_type(numpy.array([]), Array(finite=True, min=0)) is None
+
+def test_array_assertion_accepts_array_likes():
+    class Column(object):
+        def __array__(self, dtype=None):
+            return numpy.arange(3, dtype=dtype)
+    assert assert_type(Column(), Array(dtype=Numeric, ndim=1)) is None
+    assert assert_type(Column(), Or(Array(dtype=Numeric), String)) is None
+
+def test_array_assertion_rejects_unknown_options():
+    with pytest.raises(exceptions.BadTypeSpecError):
+        Array(size=3)
+
+def test_list_assertion_accepts_buffers_when_asked():
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(numpy.zeros(3), List(Numeric))
+    assert assert_type(numpy.zeros(3), List(Numeric, buffers=True)) is None
+    assert assert_type(numpy.arange(3, dtype='int8'), List(Numeric, buffers=True)) is None
+    assert assert_type(array('d', [1.0, 2.0]), List(Numeric, buffers=True)) is None
+    assert assert_type([1, 2.0], List(Numeric, buffers=True)) is None
+
+def test_list_assertion_checks_buffer_items_when_the_type_is_not_enough():
+    values = numpy.array([1, 'a'], dtype=object)
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(values, List(Numeric, buffers=True))
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(numpy.zeros(3), List(String, buffers=True))
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(numpy.zeros((3, 3)), List(Numeric, buffers=True))
+
+def test_typechecked_function_with_array_argument():
+    @typechecked(features=Array(dtype=float, ndim=1, finite=True))
+    def score(features):
+        return features.sum()
+    assert score(numpy.ones(1000000)) == 1000000
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        score(numpy.array([numpy.inf]))
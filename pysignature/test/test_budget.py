@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from pysignature import exceptions
+from pysignature import typechecked
+from pysignature.types import Any, Dictionary, List, Numeric, Or, Record, String, Tuple
+
+@typechecked(a=List(Any), b=Dictionary(String, List(Numeric)), _max_elements=100)
+def limited(a, b={}):
+    return a
+
+def test_elements_are_counted_across_the_arguments_of_a_call():
+    limited(range(50), {'x': range(40)})
+    with pytest.raises(exceptions.BudgetExceededError) as error:
+        limited(range(50), {'x': range(60)})
+    assert str(error.value) == 'Typecheck budget exceeded: more than 100 elements'
+    with pytest.raises(exceptions.BudgetExceededError):
+        limited(range(10 ** 6))
+    for _ in range(10):
+        limited(range(90))
+
+def test_nesting_depth_is_limited():
+    deep = List(List(List(List(Any))))
+
+    @typechecked(a=deep, _max_depth=3)
+    def fn(a):
+        return a
+
+    fn([[[]]])
+    with pytest.raises(exceptions.BudgetExceededError) as error:
+        fn([[[[1]]]])
+    assert 'nesting deeper than 3 levels' in str(error.value)
+
+def test_records_account_their_nested_containers():
+    @typechecked(a=Record({'items': List(Tuple(Numeric))}), _max_elements=10, _max_depth=3)
+    def fn(a):
+        return a
+
+    fn({'items': [(1,)] * 3})
+    with pytest.raises(exceptions.BudgetExceededError):
+        fn({'items': [(1,)] * 20})
+
+    @typechecked(a=Record({'a': Record({'b': Record({'c': List(Any)})})}), _max_depth=3)
+    def deep(a):
+        return a
+
+    with pytest.raises(exceptions.BudgetExceededError):
+        deep({'a': {'b': {'c': []}}})
+
+def test_deadline_aborts_slow_checks():
+    def slow(value):
+        time.sleep(0.002)
+
+    @typechecked(a=List(List(slow)), _deadline=0.01)
+    def fn(a):
+        return a
+
+    fn([[1]])
+    with pytest.raises(exceptions.BudgetExceededError) as error:
+        fn([[1]] * 100)
+    assert 'deadline' in str(error.value)
+
+def test_deadline_is_checked_while_walking_large_containers():
+    @typechecked(a=List(Tuple(String, Or(Numeric, String))), b=Record({'c': List(Numeric)}),
+                 _deadline=0.001)
+    def fn(a, b={'c': []}):
+        return a
+
+    items = [('a', 'b')] * 500000
+    for args in [(items,), ([], {'c': range(500000) * 4})]:
+        start = time.time()
+        with pytest.raises(exceptions.BudgetExceededError):
+            fn(*args)
+        assert time.time() - start < 0.1
+
+def test_values_of_the_wrong_type_are_not_accounted():
+    @typechecked(a=List(Numeric), b=Record({'c': List(Numeric)}), _max_elements=10)
+    def fn(a, b={'c': []}):
+        return a
+
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        fn('x' * 100)
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        fn([], {'c': 'x' * 100})
+
+def test_dictionaries_do_not_swallow_budget_errors():
+    @typechecked(a=Dictionary(String, List(Any)), _max_elements=5)
+    def fn(a):
+        return a
+
+    with pytest.raises(exceptions.BudgetExceededError):
+        fn({'a': range(10)})
+
+def test_budget_errors_are_reported_per_row_in_batches():
+    result = limited.typecheck_batch([{'a': range(10)}, {'a': range(200)}])
+    assert result.passing() == [0]
+    assert 'budget exceeded' in result.errors[1][0].error
+
+def test_budget_limits_must_be_positive():
+    with pytest.raises(exceptions.BadTypeSpecError):
+        typechecked(a=Any, _max_depth=0)(lambda a: a)
@@ -0,0 +1,105 @@
+import pytest
+
+from pysignature import cache
+from pysignature import exceptions
+from pysignature.cache import VerdictCache
+from pysignature.sampling import FirstK
+from pysignature.types import (
+    assert_type, Any, String, Numeric, List, Set, Tuple, Dictionary
+)
+
+class Counting(object):
+    """Assertion that counts the values it checks."""
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+
+def test_frozen_containers_are_checked_once():
+    counter = Counting()
+    assertion = List(counter, cache=VerdictCache())
+    value = [1, 2, 3]
+    cache.freeze(value)
+    for _ in range(3):
+        assert_type(value, assertion)
+    assert counter.calls == 3
+    assert assertion.options['cache'].hits == 2
+    cache.thaw(value)
+
+def test_unfrozen_containers_are_always_checked():
+    counter = Counting()
+    verdicts = VerdictCache()
+    assertion = Set(counter, cache=verdicts)
+    for _ in range(2):
+        assert_type(set([1, 2]), assertion)
+    assert counter.calls == 4
+    assert (verdicts.hits, verdicts.misses) == (0, 2)
+
+def test_touch_and_thaw_invalidate_verdicts():
+    assertion = List(Numeric, cache=VerdictCache())
+    value = [1, 2]
+    cache.freeze(value)
+    assert_type(value, assertion)
+    value.append('a')
+    assert_type(value, assertion)
+    cache.touch(value)
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(value, assertion)
+    value.pop()
+    assert_type(value, assertion)
+    cache.thaw(value)
+    assert cache.version(value) is None
+    value.append('a')
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(value, assertion)
+
+def test_failures_are_not_remembered():
+    verdicts = VerdictCache()
+    assertion = Dictionary(String, Numeric, cache=verdicts)
+    value = {'a': 'b'}
+    cache.freeze(value)
+    for _ in range(2):
+        with pytest.raises(exceptions.TypeAssertionError):
+            assert_type(value, assertion)
+    assert verdicts.hits == 0
+    cache.thaw(value)
+
+def test_weakly_referenced_objects_are_forgotten_when_collected():
+    class Config(dict):
+        pass
+    value = Config(a=1)
+    cache.freeze(value)
+    key = id(value)
+    assert key in cache._frozen
+    del value
+    assert key not in cache._frozen
+
+def test_atomic_tuples_are_remembered_by_value_and_types():
+    counter = Counting()
+    verdicts = VerdictCache()
+    assertion = Tuple(counter, Any, cache=verdicts)
+    assert_type((1, 'a'), assertion)
+    assert_type((1, 'a'), assertion)
+    assert_type((1.0, 'a'), assertion)
+    assert_type(((1,), 'a'), assertion)
+    assert counter.calls == 3
+    assert verdicts.hits == 1
+
+def test_least_recently_used_entries_are_evicted():
+    verdicts = VerdictCache(2)
+    assertion = Tuple(Numeric, cache=verdicts)
+    for value in [(1,), (2,), (1,), (3,), (1,), (2,)]:
+        assert_type(value, assertion)
+    assert verdicts.evictions == 2
+    assert verdicts.hits == 2
+    assert len(verdicts.entries) == 2
+
+def test_sampled_containers_are_not_remembered():
+    verdicts = VerdictCache()
+    assertion = List(Numeric, cache=verdicts, sample=FirstK(1))
+    value = [1, 'a']
+    cache.freeze(value)
+    assert_type(value, assertion)
+    assert verdicts.entries == {}
+    cache.thaw(value)
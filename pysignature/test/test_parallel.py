@@ -0,0 +1,63 @@
+import pytest
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+
+from pysignature import exceptions
+from pysignature import parallel
+from pysignature import typechecked
+from pysignature.types import (
+    List, Set, Dictionary, Tuple, String, Numeric, assert_type
+)
+
+@pytest.fixture(scope='module')
+def threads(request):
+    pool = ThreadPool(4)
+    request.addfinalizer(pool.terminate)
+    return pool
+
+@pytest.fixture(scope='module')
+def processes(request):
+    pool = Pool(2)
+    request.addfinalizer(pool.terminate)
+    return pool
+
+def test_first_failure_reports_the_first_failing_chunk(threads):
+    items = range(100)
+    items[35] = items[75] = 'a'
+    assert parallel.first_failure(threads, Numeric, items, 10) == 35
+    assert parallel.first_failure(threads, Numeric, range(100), 10) is None
+
+def test_parallel_list_assertion(threads, processes):
+    rows = [('a', i) for i in range(1000)]
+    for pool in (threads, processes):
+        assertion = List(Tuple(String, Numeric), parallel=pool, chunk_size=100)
+        assert assert_type(rows, assertion) is None
+        with pytest.raises(exceptions.TypeAssertionError) as error:
+            assert_type(rows + [(1, 1)], assertion)
+        assert error.value.assertion is assertion
+
+def test_parallel_set_and_dictionary_assertions(threads):
+    assert assert_type(set(range(1000)), Set(int, parallel=threads, chunk_size=100)) is None
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(set(range(1000)) | {'a'}, Set(int, parallel=threads, chunk_size=100))
+
+    mapping = dict(('k%i' % i, i) for i in range(1000))
+    assertion = Dictionary(String, Numeric, parallel=threads, chunk_size=100)
+    assert assert_type(mapping, assertion) is None
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(dict(mapping, x='a'), assertion)
+
+def test_parallel_assertion_checks_small_containers_in_place():
+    class Unusable(object):
+        pass
+    assertion = List(int, parallel=Unusable(), chunk_size=100)
+    assert assert_type(range(100), assertion) is None
+
+def test_typechecked_executor_option(threads):
+    @typechecked(rows=List(Numeric), name=String, _executor=threads, _chunk_size=100)
+    def total(rows, name):
+        return sum(rows)
+    assert 'parallel' in total.signature.type_spec['rows'].options
+    assert total(range(1000), 'a') == 499500
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        total(range(1000) + ['a'], 'a')
@@ -0,0 +1,67 @@
+import pickle
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+
+import pytest
+
+from pysignature import exceptions
+from pysignature import typechecked
+from pysignature.cache import VerdictCache
+from pysignature.types import (
+    assert_type, Dictionary, List, Numeric, Or, Record, String, Tuple
+)
+
+SPEC = dict(a=List(Tuple(String, Or(Numeric, String))), b=Record({'c': int}), _mode='fail_fast')
+
+@typechecked(**SPEC)
+def scored(a, b=None):
+    return len(a)
+
+@typechecked(x=Numeric)
+def typed_square(x):
+    return x * x
+
+def test_assertions_survive_pickling():
+    for assertion in SPEC['a'], SPEC['b'], Dictionary(String, List(int)):
+        restored = pickle.loads(pickle.dumps(assertion, pickle.HIGHEST_PROTOCOL))
+        assert restored == assertion
+    restored = pickle.loads(pickle.dumps(SPEC['a']))
+    assert_type([('a', 1)], restored)
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type([(1, 1)], restored)
+
+def test_process_local_options_are_not_pickled():
+    pool = ThreadPool(1)
+    try:
+        assertion = List(int, parallel=pool, cache=VerdictCache(8))
+        assertion.options['cache'].hits = 3
+        restored = pickle.loads(pickle.dumps(assertion))
+    finally:
+        pool.terminate()
+    assert 'parallel' not in restored.options
+    assert restored.options['cache'].size == 8
+    assert restored.options['cache'].hits == 0
+
+def test_signatures_survive_pickling():
+    restored = pickle.loads(pickle.dumps(scored.signature, pickle.HIGHEST_PROTOCOL))
+    assert restored.fn is scored.untyped
+    assert restored.max_errors == 1
+    restored.typecheck([('a', 'b')], {'c': 1})
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        restored.typecheck([1])
+
+def test_signatures_of_unreachable_functions_cannot_be_pickled():
+    @typechecked(a=int)
+    def nested(a):
+        return a
+    with pytest.raises(pickle.PicklingError):
+        pickle.dumps(nested.signature)
+
+def test_typechecked_functions_run_in_process_pools():
+    pool = Pool(2)
+    try:
+        assert pool.map(typed_square, [1, 2, 3]) == [1, 4, 9]
+        with pytest.raises(exceptions.FunctionTypeCheckError):
+            pool.map(typed_square, ['a'])
+    finally:
+        pool.terminate()
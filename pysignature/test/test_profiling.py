@@ -0,0 +1,77 @@
+import pytest
+
+from pysignature import exceptions
+from pysignature import profiling
+from pysignature import typechecked
+from pysignature.types import String, Numeric, List, Tuple, Or
+
+@typechecked(a=List(Tuple(Or(String, Numeric), Numeric)), b=String, _profile=True)
+def profiled(a, b='b'):
+    return a
+
+NAME = __name__ + '.profiled'
+
+@pytest.fixture(autouse=True)
+def clean(request):
+    profiling.reset()
+    request.addfinalizer(profiling.stop)
+
+def test_calls_are_not_profiled_until_started():
+    profiled([('a', 1)])
+    assert profiling.top() == []
+    assert profiled.signature.profile._instrumented is None
+
+def test_profiled_calls_record_every_node_of_the_assertion_tree():
+    profiling.start()
+    profiled([('a', 1), (2, 3)], 'c')
+    nodes = dict((stack, calls) for stack, calls, _, _ in profiling.top(100))
+    prefix = NAME + ';a;List(Tuple(Or(String, Numeric), Numeric))'
+    assert nodes[prefix] == 1
+    assert nodes[prefix + ';Tuple(Or(String, Numeric), Numeric)'] == 2
+    assert nodes[prefix + ';Tuple(Or(String, Numeric), Numeric);Or(String, Numeric)'] == 2
+    assert nodes[NAME + ';b;String'] == 1
+    for stack, calls, total, own in profiling.top(100):
+        assert 0 <= own <= total
+
+def test_profiled_calls_still_fail():
+    profiling.start()
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        profiled([('a', 'x')])
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        profiled([('a', 1)], 1)
+
+def test_collapsed_stacks_and_report():
+    profiling.start()
+    for _ in range(50):
+        profiled([('a', 1)] * 20)
+    lines = profiling.collapsed().splitlines()
+    assert lines
+    for line in lines:
+        stack, micros = line.rsplit(' ', 1)
+        assert stack.startswith(NAME + ';')
+        assert int(micros) > 0
+    report = profiling.report(3).splitlines()
+    assert len(report) == 4
+    assert 'assertion' in report[0]
+
+def test_sampling_rate():
+    profiling.start(0.0001)
+    for _ in range(100):
+        profiled([])
+    profiling.stop()
+    calls = sum(calls for stack, calls, _, _ in profiling.top(100) if stack.endswith(';a'))
+    assert calls < 10
+
+def test_profiled_calls_keep_the_budget():
+    from pysignature.types import Record
+    @typechecked(x=List(Numeric), y=Record({'a': List(Numeric)}), _max_elements=10,
+                 _profile=True)
+    def limited(x, y={'a': []}):
+        pass
+    profiling.start()
+    limited(range(5))
+    with pytest.raises(exceptions.BudgetExceededError):
+        limited(range(100))
+    with pytest.raises(exceptions.BudgetExceededError):
+        limited([], {'a': range(100)})
+    assert any(stack.startswith(__name__ + '.limited;x') for stack, _, _, _ in profiling.top())
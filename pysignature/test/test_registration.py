@@ -0,0 +1,111 @@
+import sys
+import types
+
+import pytest
+
+from pysignature import exceptions
+from pysignature import signature
+from pysignature import typechecked
+from pysignature.registration import typechecked_methods, typecheck_module
+from pysignature.types import String, Numeric
+
+def test_lazy_signatures_are_built_on_the_first_call():
+    @typechecked(a=String, _lazy=True)
+    def fn(a):
+        return a
+    assert fn.signature is None
+    assert fn('a') == 'a'
+    assert fn.signature is not None
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        fn(1)
+
+def test_lazy_generator_functions_stay_generator_functions():
+    import inspect
+    @typechecked(a=String, _yields=String, _lazy=True)
+    def gen(a):
+        yield a
+        yield 1
+    assert inspect.isgeneratorfunction(gen)
+    generator = gen(1)
+    assert gen.signature is None
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        next(generator)
+    assert gen.signature is not None
+    assert inspect.isgeneratorfunction(gen)
+    generator = gen('a')
+    assert next(generator) == 'a'
+    with pytest.raises(exceptions.OutputTypeCheckError):
+        next(generator)
+
+def test_lazy_spec_errors_are_raised_by_warm_all():
+    @typechecked(a=String, _lazy=True)
+    def bad(a, *args):
+        return a
+    with pytest.raises(exceptions.BadTypeSpecError) as error:
+        signature.warm_all(__name__)
+    assert 'bad: No type specified for variadic arguments' in str(error.value)
+    signature._pending.discard(bad)
+
+def test_warm_all_builds_pending_signatures():
+    @typechecked(a=String, _returns=String, _lazy=True)
+    def fn(a):
+        return a
+    signature.warm_all('other.module')
+    assert fn.signature is None
+    signature.warm_all(__name__)
+    assert fn.signature.returns is not None
+
+def test_class_decorator_typechecks_methods():
+    @typechecked_methods(
+        instance=dict(a=String),
+        static=dict(a=Numeric),
+        klass=dict(a=Numeric),
+    )
+    class Example(object):
+        def instance(self, a):
+            return a
+
+        @staticmethod
+        def static(a):
+            return a
+
+        @classmethod
+        def klass(cls, a):
+            return cls
+
+    example = Example()
+    assert Example.__dict__['instance'].signature is None
+    assert example.instance('a') == 'a'
+    assert Example.static(1) == 1
+    assert example.klass(1) is Example
+    for call in (lambda: example.instance(1), lambda: Example.static('a'),
+                 lambda: Example.klass('a')):
+        with pytest.raises(exceptions.FunctionTypeCheckError):
+            call()
+    assert Example.__dict__['instance'].signature is not None
+    assert not hasattr(Example.__dict__['instance'], 'warm')
+
+def test_class_decorator_rejects_unknown_methods():
+    with pytest.raises(exceptions.BadTypeSpecError):
+        @typechecked_methods(missing=dict(a=String))
+        class Example(object):
+            pass
+
+def test_module_registration_replaces_the_functions():
+    module = types.ModuleType('registered')
+    exec('def fn(a):\n    return a\n', module.__dict__)
+    sys.modules['registered'] = module
+    try:
+        typecheck_module('registered', fn=dict(a=String))
+        lazy = module.fn
+        assert lazy.signature is None
+        assert lazy('a') == 'a'
+        assert module.fn is not lazy
+        with pytest.raises(exceptions.FunctionTypeCheckError):
+            lazy(1)
+        with pytest.raises(exceptions.FunctionTypeCheckError):
+            module.fn(1)
+        with pytest.raises(exceptions.BadTypeSpecError):
+            typecheck_module(module, missing=dict(a=String))
+    finally:
+        del sys.modules['registered']
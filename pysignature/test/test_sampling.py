@@ -0,0 +1,54 @@
+import pytest
+
+from pysignature import exceptions
+from pysignature.sampling import Full, FirstK, RandomK, Adaptive
+from pysignature.types import List, Set, Dictionary, String, assert_type
+
+def test_full_strategy_checks_every_element():
+    strategy = Full()
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type([1] * 100 + ['a'], List(int, sample=strategy))
+    assert error.value.strategy == 'full'
+    assert strategy.counts == {'full': 1}
+
+def test_first_k_strategy_only_checks_the_first_elements():
+    strategy = FirstK(10)
+    assert assert_type(range(10) + ['a'], List(int, sample=strategy)) is None
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type(range(9) + ['a'] + range(5), List(int, sample=strategy))
+    assert error.value.strategy == 'first'
+    assert strategy.counts == {'first': 2}
+
+def test_first_k_strategy_checks_small_containers_in_full():
+    strategy = FirstK(10)
+    assert assert_type({'a': 1}, Dictionary(String, int, sample=strategy)) is None
+    assert strategy.counts == {'full': 1}
+
+def test_random_k_strategy_checks_k_elements():
+    checked = []
+    def counted(value):
+        checked.append(value)
+    strategy = RandomK(5)
+    assert assert_type(set(range(100)), Set(counted, sample=strategy)) is None
+    assert len(checked) == 5
+    assert strategy.counts == {'random': 1}
+
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type(dict.fromkeys(range(100), 'a'), Dictionary(int, int, sample=RandomK(5)))
+    assert error.value.strategy == 'random'
+
+def test_adaptive_strategy_drops_rate_after_clean_calls_and_resets_on_failure():
+    strategy = Adaptive(after=2, rate=0.1, minimum=1)
+    assertion = List(int, sample=strategy)
+    for _ in range(3):
+        assert_type(range(100), assertion)
+    assert strategy.counts == {'full': 2, 'random': 1}
+
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type(['a'] * 100, assertion)
+    assert error.value.strategy == 'random'
+    assert assert_type(range(100), assertion) is None
+    assert strategy.counts == {'full': 3, 'random': 2}
+
+def test_sampled_assertion_repr():
+    assert repr(List(int, sample=FirstK(3))) == 'List(int, sample=FirstK(3))'
@@ -103,3 +103,315 @@ def test_wrapped_function_throws_an_error_when_wrong_number_of_arguments():
     with pytest.raises(TypeError) as error:
         x()
     assert str(error.value) == "x() takes exactly 3 arguments (0 given)"
+
+def test_typechecked_decorator_positional_arguments_by_keyword():
+    assert x(1, c='c', b=2) == 'c3'
+    with pytest.raises(exceptions.FunctionTypeCheckError) as error:
+        x(c=1, a=1, b=2)
+    assert [err.arg for err in error.value.errors] == ['c']
+
+def test_typechecked_decorator_variadic_and_keyword_arguments_together():
+    @typechecked(a=int, _variadic=int, _named=String)
+    def tmp(a, *args, **kwargs):
+        return a + sum(args), sorted(kwargs.values())
+    assert tmp(1, 2, 3, b='x', c='y') == (6, ['x', 'y'])
+    with pytest.raises(exceptions.FunctionTypeCheckError) as error:
+        tmp('a', 2, 'c', b=3)
+    assert {'a', 'Variadic argument 1', "Keyword argument 'b'"} == set(
+        err.arg for err in error.value.errors)
+
+def test_wrapped_function_throws_an_error_on_unexpected_keyword_argument():
+    with pytest.raises(TypeError) as error:
+        x(1, 2, 'c', d=4)
+    assert str(error.value) == "x() got an unexpected keyword argument 'd'"
+
+def test_wrapped_function_throws_an_error_on_multiple_values_for_argument():
+    with pytest.raises(TypeError) as error:
+        x(1, 2, 'c', a=4)
+    assert str(error.value) == "x() got multiple values for keyword argument 'a'"
+
+def test_typespec_validation_error_tuple_parameters():
+    with pytest.raises(exceptions.BadTypeSpecError) as error:
+        @typechecked(a=int, b=int, c=int)
+        def tmp(a, (b, c)):
+            pass
+    assert 'Tuple parameters are not supported' in str(error)
+
+def test_default_values_are_checked_once_at_decoration_time():
+    calls = []
+    def counted(value):
+        calls.append(value)
+    @typechecked(a=counted, b=counted)
+    def tmp(a, b='default'):
+        return a
+    assert calls == ['default']
+    tmp(1)
+    tmp(2)
+    assert calls == ['default', 1, 2]
+
+def test_omitted_argument_with_wrongly_typed_default_fails():
+    @typechecked(a=int, b=String)
+    def tmp(a, b=None):
+        return a
+    assert tmp(1, 'b') == 1
+    with pytest.raises(exceptions.FunctionTypeCheckError) as error:
+        tmp(1)
+    assert error.value.errors[0].arg == 'b'
+    assert "'None' is not a String" in error.value.errors[0].error
+
+def test_cache_immutables_option_skips_repeated_constants():
+    calls = []
+    def counted(value):
+        calls.append(value)
+    @typechecked(a=counted, _variadic=counted, _cache_immutables=True)
+    def tmp(a, *args):
+        return a
+    tmp(None, 1, 1.0)
+    tmp(None, 1, 1.0, [])
+    tmp(None, 1, 1.0, [])
+    assert calls == [None, 1, 1.0, [], []]
+
+def test_cache_immutables_option_does_not_cache_failures():
+    @typechecked(a=Numeric, _cache_immutables=2)
+    def tmp(a):
+        return a
+    for _ in range(2):
+        with pytest.raises(exceptions.FunctionTypeCheckError):
+            tmp('a')
+    assert tmp(1) == 1
+
+def test_function_typecheck_error_keeps_assertion_errors():
+    with pytest.raises(exceptions.FunctionTypeCheckError) as error:
+        x(1, 2, 3)
+    exception = error.value.errors[0].exception
+    assert isinstance(exception, exceptions.TypeAssertionError)
+    assert exception.target == 3
+    assert error.value.fn is x.untyped
+
+def test_fail_fast_mode_stops_at_the_first_failure():
+    checked = []
+    def counted(value):
+        checked.append(value)
+        raise ValueError
+    @typechecked(a=int, _variadic=counted, _mode='fail_fast')
+    def tmp(a, *args):
+        pass
+    with pytest.raises(exceptions.FunctionTypeCheckError) as error:
+        tmp(1, *range(10000))
+    assert checked == [0]
+    assert [err.arg for err in error.value.errors] == ['Variadic argument 0']
+
+def test_calls_that_cannot_be_bound_fail_the_same_way_in_every_mode():
+    for mode in ('collect', 'fail_fast'):
+        @typechecked(a=int, _mode=mode)
+        def tmp(a):
+            pass
+        for args, kwargs in [(('x',), {'b': 2}), (('x', 2), {}), (('x',), {'a': 1}), ((), {})]:
+            with pytest.raises(TypeError) as error:
+                tmp(*args, **kwargs)
+            assert not isinstance(error.value, exceptions.PySignatureError)
+
+def test_defaults_whose_check_raises_only_fail_when_omitted():
+    @typechecked(x=Numeric)
+    def tmp(x=None):
+        return x
+    assert tmp(5) == 5
+    with pytest.raises(TypeError):
+        tmp()
+
+def test_max_errors_option_stops_after_the_given_amount_of_failures():
+    @typechecked(_variadic=int, _max_errors=3)
+    def tmp(*args):
+        pass
+    with pytest.raises(exceptions.FunctionTypeCheckError) as error:
+        tmp(*(['a'] * 100))
+    assert len(error.value.errors) == 3
+    assert "error in 3 argument(s)" in str(error.value)
+    assert tmp(1, 2) is None
+
+def test_invalid_error_budget_options():
+    with pytest.raises(exceptions.BadTypeSpecError) as error:
+        @typechecked(a=int, _mode='lazy')
+        def tmp(a):
+            pass
+    assert "Unknown mode: 'lazy'" in str(error)
+    with pytest.raises(exceptions.BadTypeSpecError):
+        @typechecked(a=int, _max_errors=0)
+        def tmp(a):
+            pass
+
+def test_typechecked_function_receives_checked_iterables():
+    from pysignature.types import Iterable
+    @typechecked(rows=Iterable(Tuple(String, Numeric)), _variadic=Iterable(int),
+                 _named=Iterable(String))
+    def total(rows, *others, **names):
+        return sum(value for _, value in rows)
+    assert total(('a', i) for i in xrange(100)) == 4950
+    assert total([], iter([1]), a=['x']) == 0
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        total(iter([('a', 1), ('b', 'c')]))
+    assert error.value.path == '[1]'
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        total(1)
+
+def test_lazily_checked_iterables_are_not_consumed_by_the_signature():
+    from pysignature.types import Iterable
+    @typechecked(items=Iterable(int))
+    def first(items):
+        return next(items)
+    assert first(iter([1, 2])) == 1
+
+def test_typechecked_generator_function_stays_a_generator_function():
+    import inspect
+    @typechecked(n=int)
+    def count(n):
+        for i in range(n):
+            yield i
+    assert inspect.isgeneratorfunction(count)
+    assert list(count(3)) == [0, 1, 2]
+    generator = count('a')
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        next(generator)
+
+def test_typechecked_generator_forwards_sent_values_and_exceptions():
+    @typechecked(start=Numeric)
+    def accumulate(start):
+        total = start
+        while True:
+            try:
+                value = yield total
+            except ValueError:
+                value = -total
+            total += value
+    generator = accumulate(1)
+    assert next(generator) == 1
+    assert generator.send(2) == 3
+    assert generator.throw(ValueError) == 0
+    generator.close()
+    with pytest.raises(StopIteration):
+        next(generator)
+
+def test_typechecked_generator_propagates_unhandled_exceptions():
+    @typechecked(n=int)
+    def stop_at(n):
+        yield n
+        raise KeyError(n)
+    generator = stop_at(1)
+    assert next(generator) == 1
+    with pytest.raises(KeyError):
+        next(generator)
+
+def test_typechecked_return_value():
+    @typechecked(a=Numeric, _returns=String)
+    def tmp(a):
+        return a if a > 0 else str(a)
+    assert tmp(-1) == '-1'
+    with pytest.raises(exceptions.OutputTypeCheckError) as error:
+        tmp(1)
+    assert isinstance(error.value, exceptions.FunctionTypeCheckError)
+    assert str(error.value) == "Failed to typecheck function 'tmp': invalid return value"
+    assert error.value.errors[0].arg == 'Return value'
+    assert "'1' is not a String" in error.value.errors[0].error
+
+def test_typechecked_yielded_values():
+    @typechecked(items=List(Any), _yields=Numeric)
+    def tmp(items):
+        for item in items:
+            yield item
+    assert list(tmp([1, 2.5])) == [1, 2.5]
+    generator = tmp([1, 'a'])
+    assert next(generator) == 1
+    with pytest.raises(exceptions.OutputTypeCheckError) as error:
+        next(generator)
+    assert str(error.value) == "Failed to typecheck function 'tmp': invalid yielded value 1"
+
+def test_typechecked_output_rate():
+    @typechecked(a=Any, _returns=String, _output_rate=0)
+    def unchecked(a):
+        return a
+    assert unchecked(1) == 1
+
+    @typechecked(a=Any, _returns=String, _output_rate=0.5)
+    def sampled(a):
+        return a
+    failures = 0
+    for _ in range(200):
+        try:
+            sampled(1)
+        except exceptions.OutputTypeCheckError:
+            failures += 1
+    assert 0 < failures < 200
+
+def test_typespec_validation_errors_for_outputs():
+    with pytest.raises(exceptions.BadTypeSpecError) as error:
+        @typechecked(a=int, _yields=int)
+        def tmp(a):
+            return a
+    assert 'Function is not a generator' in str(error)
+    with pytest.raises(exceptions.BadTypeSpecError):
+        @typechecked(a=int, _returns=int, _output_rate=2)
+        def tmp(a):
+            return a
+    with pytest.raises(exceptions.BadTypeSpecError) as error:
+        @typechecked(a=int, _returns=int)
+        def tmp(a):
+            yield a
+    assert 'Generator functions are checked with _yields' in str(error)
+
+def test_returned_and_yielded_iterables_are_checked_as_consumed():
+    from pysignature.types import Iterable
+    @typechecked(a=Any, _returns=Iterable(String))
+    def returned(a):
+        return iter(a)
+    assert list(returned(['x', 'y'])) == ['x', 'y']
+    checked = returned(['x', 2])
+    assert next(checked) == 'x'
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        next(checked)
+    assert error.value.path == '[1]'
+
+    @typechecked(a=Any, _yields=Iterable(int))
+    def yielded(a):
+        yield a
+    with pytest.raises(exceptions.TypeAssertionError):
+        list(next(yielded([1, 'b'])))
+
+def test_typecheck_batch_returns_a_bitmap_and_the_errors_of_failing_rows():
+    @typechecked(a=String, b=Numeric, c=int)
+    def fn(a, b, c=1):
+        pass
+    rows = [{'a': 'x', 'b': 1}, {'a': 1, 'b': 'y'}, {'a': 'x', 'b': 2.5, 'c': 3},
+            {'b': 1}, {'a': 'x', 'b': 1, 'd': 1}] + [{'a': 'x', 'b': 1}] * 4
+    result = fn.typecheck_batch(iter(rows))
+    assert len(result) == 9
+    assert result.bitmap == bytearray('\xe5\x01')
+    assert result.passing() == [0, 2, 5, 6, 7, 8]
+    assert [result.passed(idx) for idx in range(4)] == [True, False, True, False]
+    assert sorted(result.errors) == [1, 3, 4]
+    assert [error.arg for error in result.errors[1]] == ['a', 'b']
+    assert "'1' is not a String" in result.errors[1][0].error
+    assert result.errors[3][0].error == 'Missing argument'
+    assert result.errors[4][0].arg == "Keyword argument 'd'"
+
+def test_typecheck_batch_checks_named_arguments_and_failing_defaults():
+    @typechecked(a=String, _named=int)
+    def fn(a='default', **kwargs):
+        pass
+
+    @typechecked(a=String)
+    def bad_default(a=1):
+        pass
+
+    result = fn.typecheck_batch([{'x': 1}, {'a': 'b', 'x': 'y'}])
+    assert result.passing() == [0]
+    assert result.errors[1][0].arg == "Keyword argument 'x'"
+    assert bad_default.typecheck_batch([{}, {'a': 'b'}]).passing() == [1]
+
+def test_typecheck_batch_records_any_exception_of_a_check_in_its_row():
+    @typechecked(a=Numeric, _named=Numeric)
+    def fn(a, **kwargs):
+        pass
+    result = fn.typecheck_batch([{'a': 1}, {'a': None}, {'a': 2, 'b': None}, {'a': 3}])
+    assert result.passing() == [0, 3]
+    assert isinstance(result.errors[1][0].exception, TypeError)
+    assert result.errors[2][0].arg == "Keyword argument 'b'"
@@ -0,0 +1,62 @@
+import pytest
+
+from pysignature import exceptions
+from pysignature import stats
+from pysignature import typechecked
+from pysignature.types import String, Numeric, List
+
+@typechecked(a=String, b=List(Numeric), _stats=True)
+def recorded(a, b):
+    return a
+
+@typechecked(a=String)
+def unrecorded(a):
+    return a
+
+NAME = __name__ + '.recorded'
+
+def test_signatures_without_the_option_have_no_stats():
+    assert unrecorded.signature.stats is None
+    assert __name__ + '.unrecorded' not in stats.snapshot()
+
+def test_stats_count_calls_time_and_failures():
+    stats.reset()
+    recorded('a', [1])
+    recorded('a', [2, 3])
+    for _ in range(3):
+        with pytest.raises(exceptions.FunctionTypeCheckError):
+            recorded(1, ['x'])
+    snapshot = stats.snapshot()[NAME]
+    assert snapshot['calls'] == 5
+    assert snapshot['failures'] == 3
+    assert snapshot['time'] > 0
+    assert sum(snapshot['histogram'].values()) == 5
+    assert snapshot['argument_failures'] == {'a': 3, 'b': 3}
+    assert snapshot['assertion_failures'] == {'String': 3, 'List(Numeric)': 3}
+
+def test_stats_account_extra_arguments_under_their_parameter():
+    @typechecked(_variadic=Numeric, _named=Numeric, _stats=True)
+    def extra(*args, **kwargs):
+        pass
+    for idx in range(50):
+        with pytest.raises(exceptions.FunctionTypeCheckError):
+            extra(*(['x'] * idx + ['y']), **{'k%i' % idx: 'z'})
+    assert extra.signature.stats.snapshot()['argument_failures'] == {
+        '_variadic': sum(range(1, 51)),
+        '_named': 50,
+    }
+
+def test_stats_reset():
+    recorded('a', [1])
+    stats.reset()
+    snapshot = stats.snapshot()[NAME]
+    assert snapshot['calls'] == 0
+    assert snapshot['histogram'] == {}
+
+def test_stats_snapshot_tells_apart_functions_with_the_same_name():
+    @typechecked(a=String, _stats=True)
+    def recorded(a):
+        return a
+    snapshot = stats.snapshot()
+    assert NAME in snapshot
+    assert NAME + '#2' in snapshot
@@ -0,0 +1,62 @@
+import pytest
+
+from pysignature import exceptions
+from pysignature import switch
+from pysignature import typechecked
+from pysignature.types import String, Numeric
+
+@pytest.fixture(autouse=True)
+def restore(request):
+    request.addfinalizer(switch.enable)
+    request.addfinalizer(switch.unelide)
+
+def decorate():
+    @typechecked(a=String, _returns=Numeric)
+    def fn(a):
+        return a
+    return fn
+
+def test_disable_turns_existing_wrappers_into_pass_throughs():
+    fn = decorate()
+    switch.disable(__name__)
+    assert fn(1) == 1
+    switch.enable(__name__)
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        fn(1)
+
+def test_disable_covers_submodules_and_everything():
+    fn = decorate()
+    parent = __name__.rsplit('.', 1)[0]
+    switch.disable(parent)
+    assert not switch.is_enabled(__name__)
+    assert fn(1) == 1
+    switch.enable()
+    switch.disable()
+    assert fn(1) == 1
+    assert not switch.is_enabled('anything.else')
+
+def test_disable_leaves_other_modules_alone():
+    fn = decorate()
+    switch.disable(__name__ + 'other')
+    switch.disable('pysignature.test.test_switch.child')
+    with pytest.raises(exceptions.FunctionTypeCheckError):
+        fn(1)
+
+def test_disabled_generators_do_not_check_arguments_or_yields():
+    @typechecked(a=String, _yields=String)
+    def gen(a):
+        yield a
+    switch.disable(__name__)
+    assert list(gen(1)) == [1]
+
+def test_elided_functions_are_returned_unwrapped():
+    switch.elide(__name__)
+    def fn(a):
+        return a
+    assert typechecked(a=String)(fn) is fn
+    switch.unelide(__name__)
+    assert typechecked(a=String)(fn) is not fn
+
+def test_environment_variables_are_parsed(monkeypatch):
+    monkeypatch.setenv('PYSIGNATURE_DISABLE', ' a.b, c ,')
+    assert switch._from_environment('PYSIGNATURE_DISABLE') == set(['a.b', 'c'])
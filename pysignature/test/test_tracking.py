@@ -0,0 +1,106 @@
+import pytest
+
+from pysignature import exceptions
+from pysignature.tracking import AppendOnlyList, TrackedDict, TrackedSet
+from pysignature.types import assert_type, Dictionary, List, Set, String
+
+class Counting(object):
+    """Assertion that counts the values it checks
+    and fails for strings."""
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, value):
+        self.calls += 1
+        if isinstance(value, basestring):
+            raise ValueError
+
+def test_append_only_lists_only_check_new_elements():
+    counter = Counting()
+    assertion = List(counter, incremental=True)
+    value = AppendOnlyList([1, 2, 3])
+    assert_type(value, assertion)
+    value.append(4)
+    value.extend([5, 6])
+    value += [7]
+    assert_type(value, assertion)
+    assert counter.calls == 7
+    value.append('a')
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(value, assertion)
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(value, assertion)
+
+def test_other_list_changes_force_a_full_check():
+    counter = Counting()
+    assertion = List(counter, incremental=True)
+    value = AppendOnlyList([1, 2, 3])
+    assert_type(value, assertion)
+    value[0] = 'a'
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(value, assertion)
+    value.pop(0)
+    assert_type(value, assertion)
+    assert counter.calls == 3 + 1 + 2
+
+def test_plain_containers_are_always_checked_in_full():
+    counter = Counting()
+    assertion = List(counter, incremental=True)
+    value = [1, 2]
+    assert_type(value, assertion)
+    assert_type(value, assertion)
+    assert counter.calls == 4
+
+def test_tracked_dicts_only_check_the_keys_set_since_the_last_check():
+    counter = Counting()
+    assertion = Dictionary(String, counter, incremental=True)
+    value = TrackedDict(a=1, b=2)
+    assert_type(value, assertion)
+    value['c'] = 3
+    value.update(a=4)
+    value.setdefault('d', 5)
+    del value['b']
+    assert_type(value, assertion)
+    assert counter.calls == 2 + 3
+    value['e'] = 'x'
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(value, assertion)
+    value['e'] = 1
+    assert_type(value, assertion)
+    assert_type(value, assertion)
+    assert counter.calls == 5 + 2
+
+def test_tracked_sets_only_check_new_elements():
+    counter = Counting()
+    assertion = Set(counter, incremental=True)
+    value = TrackedSet([1, 2])
+    assert_type(value, assertion)
+    value.add(3)
+    value |= set([4])
+    value.discard(1)
+    assert_type(value, assertion)
+    assert counter.calls == 4
+    value ^= set(['a', 2])
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(value, assertion)
+
+def test_each_assertion_tracks_its_own_progress():
+    value = AppendOnlyList([1, 'a'])
+    assert_type(value, List(lambda x: x, incremental=True))
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(value, List(Counting(), incremental=True))
+
+def test_tracked_containers_survive_pickling():
+    import pickle
+    checks = [(AppendOnlyList(['a']), List(String, incremental=True)),
+              (TrackedDict(a=1), Dictionary(String, int, incremental=True)),
+              (TrackedSet(['a']), Set(String, incremental=True))]
+    for container, assertion in checks:
+        container.extra = 'x'
+        assert_type(container, assertion)
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            restored = pickle.loads(pickle.dumps(container, protocol))
+            assert type(restored) is type(container)
+            assert restored == container
+            assert restored.extra == 'x'
+            assert_type(restored, assertion)
@@ -3,7 +3,8 @@ import pytest
 from pysignature import exceptions
 from pysignature.types import (
     Any, String, Or, Tuple, List, InstanceOf, Set,
-    Dictionary, Boolean, Numeric, assert_type
+    Dictionary, Boolean, Numeric, TypeAssertion, assert_type,
+    compile_assertion, type_verdict, Iterable, intern_assertion, Record
 )
 
 def test_fail_basic_type_assertion():
@@ -131,3 +132,248 @@ def test_numeric_assertion_failure():
     with pytest.raises(exceptions.PySignatureError) as error:
         assert_type('a', Numeric)
     assert "'a' is not a Numeric" in str(error)
+
+def test_compiled_assertion_success_returns_none():
+    checker = compile_assertion(List(Tuple(String, Or(int, float))))
+    assert checker([('a', 1), ('b', 2.5)]) is None
+
+def test_compiled_assertion_failure():
+    checker = compile_assertion(Dictionary(String, List(Numeric)))
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        checker({'a': [1, 'b']})
+    assert "is not a Dictionary(String, List(Numeric))" in str(error)
+
+def test_compiled_assertion_for_plain_callables():
+    checker = compile_assertion(int)
+    assert checker('1') is None
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        checker('a')
+    assert "'a' is not a 'int'" in str(error)
+
+def test_custom_type_assertion_only_defining_assertion_method():
+    class Even(TypeAssertion):
+        def assertion(self, value):
+            if value % 2:
+                raise exceptions.TypeAssertionError(self, value)
+    assert assert_type(2, Even) is None
+    assert compile_assertion(List(Even))([2, 4]) is None
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        compile_assertion(List(Even))([2, 3])
+    assert "'[2, 3]' is not a List(Even)" in str(error)
+
+def test_subclasses_overriding_the_assertion_method_of_builtin_assertions():
+    class ShortString(String):
+        def assertion(self, value):
+            super(ShortString, self).assertion(value)
+            if len(value) > 5:
+                raise exceptions.TypeAssertionError(self, value)
+    assert assert_type('abc', ShortString) is None
+    for assertion, value in [(ShortString, 'abcdef'), (ShortString, 1),
+                             (List(ShortString), ['abcdef']), (Or(ShortString, Boolean), 'abcdef')]:
+        with pytest.raises(exceptions.TypeAssertionError):
+            assert_type(value, assertion)
+    assert type_verdict(ShortString, str) is None
+
+def test_parametrized_assertion_compiles_once():
+    assertion = List(int)
+    assert compile_assertion(assertion) is compile_assertion(assertion)
+
+def test_type_verdicts_of_leaf_assertions():
+    assert type_verdict(String, str) is True
+    assert type_verdict(String, int) is False
+    assert type_verdict(Numeric, bool) is True
+    assert type_verdict(Numeric, str) is None
+    assert type_verdict(InstanceOf(dict), dict) is True
+    assert type_verdict(List(int), dict) is False
+    assert type_verdict(List(int), list) is None
+    assert type_verdict(float, int) is True
+    assert type_verdict(lambda x: x, int) is None
+
+def test_or_assertion_skips_branches_that_cannot_pass():
+    calls = []
+    def counted(value):
+        calls.append(value)
+        raise ValueError
+    checker = compile_assertion(Or(String, counted, int))
+    assert checker('a') is None
+    assert checker(1) is None
+    assert calls == [1]
+
+def test_or_assertion_keeps_branch_order_for_undecided_branches():
+    def failure(value):
+        raise Exception
+    with pytest.raises(Exception):
+        assert_type(1, Or(failure, int))
+
+def test_or_assertion_with_old_style_instances():
+    class X:
+        pass
+    assert assert_type(X(), Or(String, InstanceOf(X))) is None
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(X(), Or(String, Boolean))
+
+def test_or_assertion_with_instance_checks_of_metaclasses():
+    import abc
+    class Quacking(type):
+        def __instancecheck__(cls, value):
+            return hasattr(value, 'quack')
+    class Duck(object):
+        __metaclass__ = Quacking
+    class Mallard(object):
+        quack = True
+    assert assert_type(Mallard(), Or(InstanceOf(Duck), String)) is None
+
+    class Base(object):
+        __metaclass__ = abc.ABCMeta
+    class Registered(object):
+        pass
+    checker = compile_assertion(Or(InstanceOf(Base), String))
+    with pytest.raises(exceptions.TypeAssertionError):
+        checker(Registered())
+    Base.register(Registered)
+    assert checker(Registered()) is None
+    assert type_verdict(InstanceOf(Base), Registered) is True
+
+def test_numeric_assertion_keeps_coercion_of_numeric_strings():
+    assert assert_type('1.5', Numeric) is None
+    assert assert_type([1, 2L, 3.0, True], List(Numeric)) is None
+
+def test_assertion_error_message_is_formatted_lazily():
+    formatted = []
+    class Loud(object):
+        def __str__(self):
+            formatted.append(self)
+            return 'loud'
+    value = Loud()
+    assert assert_type(value, Or(String, Any)) is None
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type(value, Or(String, Boolean))
+    assert formatted == []
+    assert error.value.target is value
+    assert "'loud' is not a Or(String, Boolean)" in str(error.value)
+    assert formatted == [value]
+
+def test_assertion_error_message_truncates_large_values():
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type(range(100000) + ['a'], List(int))
+    message = str(error.value)
+    assert message.startswith("Type assertion failed: '[0, 1, 2,")
+    assert "...]' is not a List(int)" in message
+    assert len(message) < 300
+
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type('x' * 100000, Numeric)
+    assert len(str(error.value)) < 300
+
+def test_iterable_assertion_checks_elements_as_they_are_consumed():
+    checker = compile_assertion(Iterable(Numeric))
+    checked = checker(x for x in [1, 2.5, 'a', 3])
+    assert next(checked) == 1
+    assert next(checked) == 2.5
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        next(checked)
+    assert error.value.path == '[2]'
+    assert "Type assertion failed at [2]: 'a' is not a Numeric" in str(error)
+
+def test_iterable_assertion_failure_for_non_iterables():
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type(1, Iterable(int))
+    assert "'1' is not a Iterable(int)" in str(error)
+
+def test_assertions_have_structural_equality_and_hash():
+    assert List(Or(int, String)) == List(Or(int, String()))
+    assert hash(List(Or(int, String))) == hash(List(Or(int, String())))
+    assert List(Or(int, String)) != List(Or(String, int))
+    assert Tuple(int) != List(int)
+    assert List(int, sample=None) != List(int)
+    assert String() == String()
+    assert String() != Boolean()
+
+def test_equal_assertions_share_their_compiled_checker():
+    first = Dictionary(String, List(Or(int, float, String)))
+    second = Dictionary(String, List(Or(int, float, String)))
+    assert compile_assertion(first) is compile_assertion(second)
+    assert intern_assertion(second) is first
+    assert compile_assertion(String) is compile_assertion(String())
+
+def test_assertions_nested_too_deep_are_not_interned():
+    assertion, value = int, 1
+    for _ in range(300):
+        assertion, value = Record({'x': assertion}), {'x': value}
+    assert intern_assertion(assertion) is assertion
+    compile_assertion(assertion)(value)
+
+def test_assertions_compute_their_structure_once():
+    assertion = List(Or(int, String))
+    assert assertion._key() is assertion._key()
+    assert hash(assertion) == hash(assertion)
+    assert '_structure_key' not in assertion.__getstate__()
+
+def test_assertions_with_unhashable_options_are_not_interned():
+    class Bounded(TypeAssertion):
+        def __init__(self, limits):
+            self.limits = limits
+
+        def assertion(self, value):
+            if not self.limits[0] <= value <= self.limits[1]:
+                raise ValueError
+
+    first, second = Bounded([0, 1]), Bounded([0, 1])
+    assert first == second
+    assert intern_assertion(second) is second
+    assert compile_assertion(first) is not compile_assertion(second)
+    assert Bounded((0, 1)) != Bounded((0, 2))
+    with pytest.raises(exceptions.TypeAssertionError):
+        assert_type(2, Bounded((0, 1)))
+
+PAYLOAD = Record({
+    'name': String,
+    'items': List(Record({'id': int, 'tags': List(String)}, optional={'price': Numeric})),
+    'meta': Dictionary(String, Any),
+}, extra=False)
+
+def test_record_assertion_passes_valid_payloads():
+    assert_type({'name': 'a', 'items': [], 'meta': {}}, PAYLOAD)
+    assert_type({'name': 'a', 'meta': {'k': [None]},
+                 'items': [{'id': 1, 'tags': []}, {'id': 2, 'tags': ['x'], 'price': 1.5}]},
+                PAYLOAD)
+    assert_type({'a': 1, 'b': 2}, Record({'a': int}))
+
+def test_record_assertion_reports_the_json_path_of_every_failure():
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type({'name': 'a', 'meta': {1: None}, 'extra': 1,
+                     'items': [{'id': 1, 'tags': ['x', 2]}, {'tags': [], 'price': 'a'}]},
+                    PAYLOAD)
+    paths = sorted(failure.path for failure in error.value.failures)
+    assert paths == ['$.extra', '$.items[0].tags[1]', '$.items[1].id',
+                     '$.items[1].price', '$.meta[1]']
+    messages = [str(failure) for failure in error.value.failures]
+    assert "Type assertion failed at $.items[1].id: '<missing>' is not a 'int'" in messages
+    assert "Type assertion failed at $.items[0].tags[1]: '2' is not a String" in messages
+
+def test_record_assertion_fails_for_non_dictionaries():
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type([], Record({'a': int}))
+    assert error.value.path is None
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type({'a': {'b': 'c'}}, Record({'a': List(int)}))
+    assert error.value.path == '$.a'
+    with pytest.raises(exceptions.TypeAssertionError) as error:
+        assert_type({'a b': (1, 'x')}, Record({'a b': Tuple(int, int)}))
+    assert error.value.path == "$['a b'][1]"
+
+def test_record_assertion_requires_a_dictionary_of_fields():
+    with pytest.raises(exceptions.BadTypeSpecError):
+        Record(String)
+    assert repr(Record({'a': int}, optional={'b': String})) == 'Record(a=int, b?=String)'
+
+def test_assertion_error_message_truncates_container_subclasses():
+    from collections import OrderedDict
+    from pysignature.tracking import AppendOnlyList
+    value = OrderedDict((i, i) for i in range(100000))
+    message = str(exceptions.TypeAssertionError(List(int), value))
+    assert "'{0: 0, 1: 1," in message
+    assert len(message) < 300
+    message = str(exceptions.TypeAssertionError(List(String), AppendOnlyList(range(100000))))
+    assert "'[0, 1, 2," in message
+    assert len(message) < 300
@@ -0,0 +1,163 @@
+"""Containers that remember which of their elements
+were already validated, for incremental checks.
+
+List, Set and Dictionary assertions with the option
+`incremental=True` only check the elements of these
+containers that were added (or replaced) since the
+last time they passed the same assertion:
+
+    events = AppendOnlyList()
+    ...
+    @typechecked(events=List(Event, incremental=True))
+    def flush(events):
+        ...
+
+* AppendOnlyList remembers the validated prefix.
+  Appending (append, extend, +=) keeps it, any other
+  change forgets it, so the next check is a full one.
+* TrackedDict and TrackedSet keep a log of the keys
+  (or elements) set since the last validation, and
+  only those are checked again. Removals need no
+  check at all.
+
+Only the containers are tracked: changes made in
+place to their elements go unnoticed. Every other
+container is always checked in full.
+"""
+from itertools import islice
+
+class Tracked(object):
+    """Interface of tracked containers. Every assertion
+    that checks them identifies itself with a token."""
+    __slots__ = ()
+
+    def unchecked(self, token):
+        """Return the elements (keys for dictionaries) not
+        validated yet for the token, which may be the
+        container itself, and a marker for `checked`."""
+        raise NotImplementedError
+
+    def checked(self, token, marker):
+        """Record that the elements returned along with
+        marker by `unchecked` passed."""
+        raise NotImplementedError
+
+    def __reduce__(self):
+        # Pickled as new containers: the tokens of what was
+        # validated only make sense in this process.
+        state = dict((name, value) for name, value in vars(self).iteritems()
+                     if name not in ('_validated', '_pending'))
+        return (self.__class__, (self._contents(),), state or None)
+
+class AppendOnlyList(Tracked, list):
+    """List that remembers its validated prefix."""
+    def __init__(self, *args):
+        list.__init__(self, *args)
+        self._validated = {}
+
+    def unchecked(self, token):
+        start = self._validated.get(token, 0)
+        size = len(self)
+        return (islice(self, start, size) if start else self), size
+
+    def checked(self, token, marker):
+        self._validated[token] = marker
+
+    def _contents(self):
+        return list(self)
+
+def _forgetting(method):
+    """Version of a list method that forgets
+    every validated prefix."""
+    def forget(self, *args):
+        self._validated.clear()
+        return method(self, *args)
+    forget.__name__ = method.__name__
+    return forget
+
+for _name in ('__setitem__', '__delitem__', '__setslice__', '__delslice__', '__imul__',
+              'insert', 'remove', 'pop', 'sort', 'reverse'):
+    setattr(AppendOnlyList, _name, _forgetting(getattr(list, _name)))
+
+class TrackedDict(Tracked, dict):
+    """Dictionary with a log of the keys set
+    since each validation."""
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._pending = {}
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        for keys in self._pending.itervalues():
+            keys.add(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).iteritems():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def _contents(self):
+        return dict(self)
+
+    def unchecked(self, token):
+        return _unchecked(self, token)
+
+    def checked(self, token, marker):
+        _checked(self, token, marker)
+
+class TrackedSet(Tracked, set):
+    """Set with a log of the elements added
+    since each validation."""
+    def __init__(self, *args):
+        set.__init__(self, *args)
+        self._pending = {}
+
+    def add(self, item):
+        set.add(self, item)
+        for items in self._pending.itervalues():
+            items.add(item)
+
+    def update(self, *others):
+        for other in others:
+            for item in other:
+                self.add(item)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def symmetric_difference_update(self, other):
+        added = set(other) - self
+        set.symmetric_difference_update(self, other)
+        for items in self._pending.itervalues():
+            items.update(added)
+
+    def __ixor__(self, other):
+        self.symmetric_difference_update(other)
+        return self
+
+    def _contents(self):
+        return list(self)
+
+    def unchecked(self, token):
+        return _unchecked(self, token)
+
+    def checked(self, token, marker):
+        _checked(self, token, marker)
+
+def _unchecked(container, token):
+    pending = container._pending.get(token)
+    if pending is None:
+        return container, None
+    marker = list(pending)
+    return [key for key in marker if key in container], marker
+
+def _checked(container, token, marker):
+    if marker is None:
+        container._pending[token] = set()
+    else:
+        container._pending[token].difference_update(marker)
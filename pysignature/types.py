@@ -5,9 +5,26 @@ as callables denominated **type assertions**.
 The module also provides the logic for using
 said type assertions.
 """
+from __future__ import absolute_import
+import threading
 from abc import ABCMeta
-from inspect import isclass
-from pysignature.exceptions import PySignatureError, TypeAssertionError
+from array import array
+from contextlib import contextmanager
+import re
+from inspect import isclass, getmro
+from itertools import izip
+from types import InstanceType
+from weakref import WeakValueDictionary
+from pysignature.exceptions import (
+    PySignatureError, TypeAssertionError, BadTypeSpecError, BudgetExceededError
+)
+from pysignature import parallel
+from pysignature.tracking import Tracked
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 def assert_type(value, assertion):
     """Main function for asserting
@@ -15,23 +32,339 @@ def assert_type(value, assertion):
     an assertion function.
     Returns None if succeeds, otherwise
     raise a PySignatureError."""
+    compile_assertion(assertion)(value)
+
+_class_checkers = {}
+
+def compile_assertion(assertion):
+    """Turn an assertion (anything accepted by
+    assert_type) into a single check function.
+
+    The check function receives a value, returns None
+    if it passes and raises a TypeAssertionError
+    otherwise. All of the dispatch done by assert_type
+    happens here, once, so the returned function can
+    be called repeatedly without it.
+    """
+    hook = getattr(_instrumentation, 'hook', None)
+    if hook is not None:
+        return hook(assertion, _compile_afresh(assertion))
+    elif isclass(assertion) and issubclass(assertion, TypeAssertion):
+        checker = _class_checkers.get(assertion)
+        if checker is None:
+            checker = _class_checkers[assertion] = assertion().checker
+        return checker
+    elif isinstance(assertion, TypeAssertion):
+        return assertion.checker
+    return _compile_afresh(assertion)
+
+def _compile_afresh(assertion):
+    """Check function of an assertion, ignoring every
+    cached or interned one."""
+    if isclass(assertion) and issubclass(assertion, TypeAssertion):
+        return _instance_check(assertion())
+    elif isinstance(assertion, TypeAssertion):
+        return _instance_check(assertion)
+    elif callable(getattr(assertion, 'assertion', None)):
+        return _guarded(assertion.assertion, assertion)
+    else:
+        return _guarded(assertion, assertion)
+
+_instrumentation = threading.local()
+
+@contextmanager
+def instrumented(hook):
+    """Within the block (and only in the current thread),
+    compile_assertion compiles every assertion afresh and
+    returns hook(assertion, checker) instead of its check
+    function. Nested assertions are compiled through
+    compile_assertion too, so the hook sees every node
+    of the assertion tree (see pysignature.profiling)."""
+    previous = getattr(_instrumentation, 'hook', None)
+    _instrumentation.hook = hook
     try:
-        if isclass(assertion) and issubclass(assertion, TypeAssertion):
-            assertion_instance = assertion()
-            assertion_instance.assertion(value)
-        elif callable(getattr(assertion, 'assertion', None)):
-            assertion.assertion(value)
-        else:
-            assertion(value)
+        yield
+    finally:
+        _instrumentation.hook = previous
+
+def _hook_method(name):
+    """Method name of the current instrumentation hook,
+    if any, for containers that report their progress."""
+    return getattr(getattr(_instrumentation, 'hook', None), name, None)
+
+_interned = WeakValueDictionary()
+
+def intern_assertion(assertion):
+    """Return the first interned assertion equal to
+    the given one (or the given one, which becomes it).
+
+    Every assertion is interned when first compiled,
+    so equal assertions share a single check function
+    and, with it, the dispatch tables and caches built
+    by compile. Assertions with unhashable parameters
+    or options, or nested too deep to compute their
+    structure, are not interned.
+    """
+    try:
+        return _interned.setdefault(assertion._key(), assertion)
+    except (TypeError, RuntimeError):
+        return assertion
+
+def _structure(value):
+    """Hashable description of an assertion
+    parameter, equal for equal assertions."""
+    if isinstance(value, TypeAssertion):
+        return value._key()
+    elif isclass(value) and issubclass(value, TypeAssertion):
+        return (value, ())
+    elif isinstance(value, tuple):
+        return tuple(_structure(item) for item in value)
+    elif isinstance(value, dict):
+        return tuple(sorted((key, _structure(item)) for key, item in value.iteritems()))
+    return value
+
+def _overrides(cls, name, base_name):
+    """Whether a class defines the method name lower
+    in its hierarchy than the method base_name."""
+    for klass in getmro(cls):
+        attrs = vars(klass)
+        if base_name in attrs:
+            return False
+        elif name in attrs:
+            return True
+    return False
+
+def _instance_check(assertion):
+    """Check function of an assertion instance: the one
+    built by its compile, or its own `assertion` method
+    if a subclass (e.g. of String) overrides it below the
+    compile it inherits."""
+    if _overrides(type(assertion), 'assertion', 'compile'):
+        return _guarded(assertion.assertion, assertion)
+    return assertion.compile()
+
+def _guarded(fn, assertion):
+    """Wrap a plain callable so that a ValueError
+    is reported as a failed type assertion."""
+    def check(value):
+        try:
+            fn(value)
+        except ValueError:
+            raise TypeAssertionError(getattr(assertion, '__name__', assertion), value)
+    return check
+
+# Plain callables that never fail on a value of one of
+# these exact types, e.g. int(True) or float(1).
+_COERCIONS = {
+    int: frozenset([int, long, bool]),
+    long: frozenset([int, long, bool]),
+    float: frozenset([float, int, bool]),
+    complex: frozenset([complex, float, int, bool]),
+    bool: frozenset([bool]),
+    str: frozenset([str]),
+    unicode: frozenset([unicode]),
+    tuple: frozenset([tuple]),
+    list: frozenset([list]),
+    dict: frozenset([dict]),
+    set: frozenset([set]),
+    frozenset: frozenset([frozenset]),
+}
+
+# Maximum amount of types remembered by a dispatch table.
+DISPATCH_SIZE = 256
+
+def type_verdict(assertion, cls):
+    """Return the outcome of an assertion for
+    every value whose type is exactly cls: True
+    if they all pass, False if they all fail, and
+    None if it depends on the value itself."""
+    if isclass(assertion) and issubclass(assertion, TypeAssertion):
+        assertion = assertion()
+    if isinstance(assertion, TypeAssertion):
+        if _overrides(type(assertion), 'assertion', 'accepts_type'):
+            return None
+        return assertion.accepts_type(cls)
+    try:
+        accepted = _COERCIONS.get(assertion)
+    except TypeError:
+        return None
+    if accepted is not None and cls in accepted:
+        return True
+    return None
+
+def accepted_types(assertion):
+    """Return a set of types for which the assertion
+    always passes and a function that, given a type
+    not in the set yet, decides (once per type) whether
+    it belongs there. Containers use them to skip the
+    element check altogether for such types."""
+    accepted = set()
+    undecided = set()
+    def learn(cls):
+        if cls in undecided or len(accepted) >= DISPATCH_SIZE:
+            return False
+        elif type_verdict(assertion, cls) is True:
+            accepted.add(cls)
+            return True
+        undecided.add(cls)
+        return False
+    return accepted, learn
+
+# Type of the items of an array.array, by typecode. Items
+# of 'I' and 'L' arrays can be either int or long.
+_ARRAY_ITEM_TYPES = {
+    'c': str, 'u': unicode, 'f': float, 'd': float,
+    'b': int, 'B': int, 'h': int, 'H': int, 'i': int, 'l': int,
+}
+
+def buffer_item_type(value):
+    """Type shared by every item of a homogeneous buffer
+    (array.array or one dimensional NumPy array), object
+    if the items may differ, or None for other values."""
+    if isinstance(value, array):
+        return _ARRAY_ITEM_TYPES.get(value.typecode, object)
+    elif numpy is not None and isinstance(value, numpy.ndarray) and value.ndim == 1:
+        return object if value.dtype.hasobject else value.dtype.type
+    return None
+
+def sample_failure(assertion, value, strategy, mode):
+    """Error for a container that failed while
+    checking the elements chosen by a sampling
+    strategy (or all of them if there is none)."""
+    error = TypeAssertionError(assertion, value)
+    if strategy is not None:
+        strategy.record(mode, False)
+        error.strategy = mode
+    return error
+
+def cached_check(check, options):
+    """Check function of a container with its `cache`
+    option applied (see pysignature.cache). Sampled
+    containers are never remembered."""
+    cache = options.get('cache')
+    if cache is None or options.get('sample') is not None:
+        return check
+    return cache.wrap(check)
+
+def assertion_name(assertion):
+    """Name of an assertion in the repr of another."""
+    if isinstance(assertion, TypeAssertion):
+        return repr(assertion)
+    return assertion.__name__
+
+def instance_verdict(cls, bases):
+    """Outcome of isinstance(value, bases) for every
+    value whose type is exactly cls, or None when
+    the instances may pretend to be something else
+    (old style instances or a __class__ override) or
+    the bases decide by themselves. Classes of an ABC
+    (which may be registered later) are only known to
+    pass."""
+    hooks = _instance_hooks(bases)
+    if hooks:
+        if hooks == set([ABCMeta.__instancecheck__.im_func]) and issubclass(cls, bases):
+            return True
+        return None
+    elif issubclass(cls, bases):
+        return True
+    elif cls is InstanceType:
+        return None
+    elif any('__class__' in vars(klass) for klass in getmro(cls) if klass is not object):
         return None
-    except ValueError:
-        raise TypeAssertionError(assertion.__name__, value)
+    return False
+
+def _instance_hooks(bases):
+    """The __instancecheck__ functions of the metaclasses
+    of bases (a class or a tuple of them)."""
+    hooks = set()
+    for base in (bases if isinstance(bases, tuple) else (bases,)):
+        for meta in getmro(type(base)):
+            if meta is type:
+                break
+            hook = vars(meta).get('__instancecheck__')
+            if hook is not None:
+                hooks.add(hook)
+                break
+    return hooks
+
+# Attributes derived from the state of an assertion,
+# which are not part of its structure nor pickled.
+_DERIVED = ('_checker', '_compiled', '_structure_key', '_structure_hash')
 
 class TypeAssertion(object):
     """Base abstract class for defining type assertions."""
     __metaclass___ = ABCMeta
-    def assertion(self, *args):
-        raise NotImplementedError
+    def assertion(self, value):
+        """Check value with the function built by compile,
+        which subclasses overriding this method can call."""
+        try:
+            compiled = self._compiled
+        except AttributeError:
+            compiled = self._compiled = self.compile()
+        compiled(value)
+
+    def compile(self):
+        """Return the check function for this assertion.
+
+        Subclasses that only define `assertion` get it
+        wrapped as is; the ones in this module override
+        this method and precompute everything they can.
+        """
+        if self.assertion.im_func is TypeAssertion.assertion.im_func:
+            raise NotImplementedError
+        return _guarded(self.assertion, self)
+
+    def accepts_type(self, cls):
+        """Outcome of this assertion for every value of
+        the exact type cls, as described in type_verdict.
+        Unknown (None) unless a subclass knows better.
+        """
+        return None
+
+    @property
+    def checker(self):
+        """Compiled check function, built on first use
+        (or shared with an equal interned assertion)."""
+        try:
+            return self._checker
+        except AttributeError:
+            canonical = intern_assertion(self)
+            self._checker = _instance_check(self) if canonical is self else canonical.checker
+            return self._checker
+
+    def _key(self):
+        """Structure of the assertion: its class and
+        state, with nested assertions replaced by their
+        own structure (a bare assertion class stands for
+        an instance built without arguments). Assertions
+        do not change once built, so it is computed once."""
+        try:
+            return self._structure_key
+        except AttributeError:
+            state = dict(self.__dict__)
+            for name in _DERIVED:
+                state.pop(name, None)
+            self._structure_key = (self.__class__, _structure(state))
+            return self._structure_key
+
+    def __eq__(self, other):
+        return isinstance(other, TypeAssertion) and self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        try:
+            return self._structure_hash
+        except AttributeError:
+            self._structure_hash = hash(self._key())
+            return self._structure_hash
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in _DERIVED:
+            state.pop(name, None)
+        return state
 
     def __repr__(self):
         return self.__class__.__name__
@@ -48,73 +381,206 @@ class ParametrizedTypeAssertion(TypeAssertion):
 
     def __repr__(self):
         cls = self.__class__.__name__
-        reprs = []
-        for param in self.parameters:
-            if isinstance(param, TypeAssertion):
-                reprs.append(repr(param))
-            else:
-                reprs.append(param.__name__)
+        reprs = [assertion_name(param) for param in self.parameters]
+        for key in sorted(self.options):
+            option = self.options[key]
+            reprs.append('%s=%s' % (key, getattr(option, '__name__', None) or repr(option)))
         return cls + '(' + ', '.join(reprs) + ')'
 
+    def __getstate__(self):
+        """State for pickling, without the compiled
+        checker nor the executor of the `parallel`
+        option, which only makes sense in this process."""
+        state = super(ParametrizedTypeAssertion, self).__getstate__()
+        if 'parallel' in self.options:
+            state['options'] = dict(self.options)
+            del state['options']['parallel']
+        return state
+
+    def with_options(self, **options):
+        """Copy of this assertion with some options added."""
+        merged = dict(self.options)
+        merged.update(options)
+        return self.__class__(*self.parameters, **merged)
+
 
 class Any(TypeAssertion):
     """Assertion that passes on any value."""
-    def assertion(self, value):
-        pass
+    def accepts_type(self, cls):
+        return True
+
+    def compile(self):
+        def check(value):
+            pass
+        return check
 
 class String(TypeAssertion):
     """Assertion for string objects."""
-    def assertion(self, value):
-        if not isinstance(value, basestring):
-            raise TypeAssertionError(self, value)
+    def accepts_type(self, cls):
+        return instance_verdict(cls, basestring)
+
+    def compile(self):
+        def check(value):
+            if not isinstance(value, basestring):
+                raise TypeAssertionError(self, value)
+        return check
 
 class Or(ParametrizedTypeAssertion):
     """Parametrized assertion that only fails if
     the last of the given assertions does not pass.
+
+    The branches worth trying are decided once per
+    type of value and kept in a dispatch table, so
+    branches that can never pass for that type are
+    skipped without raising.
     """
-    def assertion(self, value):
-        for param in self.parameters:
+    def accepts_type(self, cls):
+        verdicts = [type_verdict(param, cls) for param in self.parameters]
+        if True in verdicts and None not in verdicts[:verdicts.index(True)]:
+            return True
+        elif all(verdict is False for verdict in verdicts):
+            return False
+        return None
+
+    def compile(self):
+        branches = zip(self.parameters,
+                       [compile_assertion(param) for param in self.parameters])
+        dispatch = {}
+
+        def plan(cls):
+            """Checkers to try, in order, for values of type cls;
+            None in the result stands for a branch that passes."""
+            remaining = []
+            for param, checker in branches:
+                verdict = type_verdict(param, cls)
+                if verdict is True:
+                    if not remaining:
+                        return True
+                    remaining.append(None)
+                    break
+                elif verdict is None:
+                    remaining.append(checker)
+            return tuple(remaining) or False
+
+        def check(value):
+            cls = type(value)
             try:
-                assert_type(value, param)
-                break
-            except TypeAssertionError:
-                pass
-            except ValueError:
-                pass
-        else:
+                checkers = dispatch[cls]
+            except KeyError:
+                checkers = plan(cls)
+                if len(dispatch) < DISPATCH_SIZE:
+                    dispatch[cls] = checkers
+            if checkers is True:
+                return
+            elif checkers is not False:
+                for checker in checkers:
+                    if checker is None:
+                        return
+                    try:
+                        checker(value)
+                        return
+                    except TypeAssertionError:
+                        pass
+                    except ValueError:
+                        pass
             raise TypeAssertionError(self, value)
+        return check
 
 class Tuple(ParametrizedTypeAssertion):
     """Assertion that verifies that a tuple
     contains the structure specified
-    in the given parameters.
+    in the given parameters. Accepts the
+    `cache` option, as List does.
     """
-    def assertion(self, value):
-        if not isinstance(value, tuple):
-            raise TypeAssertionError(self, value)
-        if not(len(value) == len(self.parameters)):
-            raise TypeAssertionError(self, value)
-        for item, param in zip(value, self.parameters):
-            try:
-                assert_type(item, param)
-            except TypeAssertionError:
+    def accepts_type(self, cls):
+        return None if instance_verdict(cls, tuple) is not False else False
+
+    def compile(self):
+        checkers = [compile_assertion(param) for param in self.parameters]
+        size = len(checkers)
+        def check(value):
+            if not isinstance(value, tuple):
+                raise TypeAssertionError(self, value)
+            if not(len(value) == size):
                 raise TypeAssertionError(self, value)
+            for item, checker in izip(value, checkers):
+                try:
+                    checker(item)
+                except TypeAssertionError:
+                    raise TypeAssertionError(self, value)
+        return cached_check(check, self.options)
 
 class List(ParametrizedTypeAssertion):
     """Assertion that verifies that the value
     is a list in which all of the elements
     pass the type assertion (given in the parameter).
+
+    With the option `buffers=True` it also accepts
+    homogeneous buffers (one dimensional NumPy arrays
+    and array.array instances); when every value of
+    the buffer's element type passes the assertion,
+    the buffer is accepted without visiting its items.
+
+    List, Set and Dictionary accept a `sample` option
+    with a strategy from pysignature.sampling, which
+    decides what elements get checked, and a `parallel`
+    option with an executor on which containers larger
+    than `chunk_size` are checked in chunks (see
+    pysignature.parallel). A VerdictCache in their
+    `cache` option remembers the frozen containers
+    that passed (see pysignature.cache), and with
+    `incremental=True` only the new elements of the
+    tracked containers of pysignature.tracking are
+    checked.
     """
-    def assertion(self, value):
-        if not isinstance(value, list):
-            raise TypeAssertionError(self, value)
+    def accepts_type(self, cls):
+        if self.options.get('buffers') and (issubclass(cls, array) or
+                                            (numpy is not None and issubclass(cls, numpy.ndarray))):
+            return None
+        return None if instance_verdict(cls, list) is not False else False
 
-        type_assertion = self.parameters[0]
-        for item in value:
-            try:
-                assert_type(item, type_assertion)
-            except TypeAssertionError:
-                raise TypeAssertionError(self, value)
+    def compile(self):
+        param = self.parameters[0]
+        checker = compile_assertion(param)
+        accepted, learn = accepted_types(param)
+        buffers = self.options.get('buffers', False)
+        strategy = self.options.get('sample')
+        executor = self.options.get('parallel')
+        chunk_size = self.options.get('chunk_size', parallel.DEFAULT_CHUNK_SIZE)
+        token = object() if self.options.get('incremental') and strategy is None else None
+        ticks = _hook_method('ticks')
+        def check(value):
+            if not isinstance(value, list):
+                item_type = buffer_item_type(value) if buffers else None
+                if item_type is None:
+                    raise TypeAssertionError(self, value)
+                elif item_type in accepted or learn(item_type):
+                    return
+            tracked = token is not None and isinstance(value, Tracked)
+            if tracked:
+                items, marker = value.unchecked(token)
+            elif executor is not None and strategy is None and len(value) > chunk_size:
+                if parallel.first_failure(executor, param, value, chunk_size) is not None:
+                    raise TypeAssertionError(self, value)
+                return
+            if tracked:
+                mode = None
+            else:
+                mode, items = (None, value) if strategy is None else strategy.select(value)
+            if ticks is not None:
+                items = ticks(items)
+            for item in items:
+                if type(item) in accepted or learn(type(item)):
+                    continue
+                try:
+                    checker(item)
+                except TypeAssertionError:
+                    raise sample_failure(self, value, strategy, mode)
+            if strategy is not None:
+                strategy.record(mode, True)
+            elif tracked:
+                value.checked(token, marker)
+        return cached_check(check, self.options)
 
 
 class InstanceOf(ParametrizedTypeAssertion):
@@ -123,10 +589,17 @@ class InstanceOf(ParametrizedTypeAssertion):
     method is run, it is checked if the value
     is an instance of the given class.
     """
-    def assertion(self, value):
+    def accepts_type(self, cls):
+        base = self.parameters[0]
+        return instance_verdict(cls, base) if isclass(base) else False
+
+    def compile(self):
         cls = self.parameters[0]
-        if not (isclass(cls) and isinstance(value, cls)):
-            raise TypeAssertionError(self, value)
+        is_class = isclass(cls)
+        def check(value):
+            if not (is_class and isinstance(value, cls)):
+                raise TypeAssertionError(self, value)
+        return check
 
 class Set(ParametrizedTypeAssertion):
     """Parametrized type assertion
@@ -134,46 +607,497 @@ class Set(ParametrizedTypeAssertion):
     is a set and every element is of the
     specified type assertion.
     """
-    def assertion(self, value):
-        t_assert = self.parameters[0]
-        if not isinstance(value, set):
-            raise TypeAssertionError(self, value)
-        for item in value:
-            try:
-                assert_type(item, t_assert)
-            except TypeAssertionError:
+    def accepts_type(self, cls):
+        return None if instance_verdict(cls, set) is not False else False
+
+    def compile(self):
+        checker = compile_assertion(self.parameters[0])
+        accepted, learn = accepted_types(self.parameters[0])
+        strategy = self.options.get('sample')
+        executor = self.options.get('parallel')
+        chunk_size = self.options.get('chunk_size', parallel.DEFAULT_CHUNK_SIZE)
+        token = object() if self.options.get('incremental') and strategy is None else None
+        ticks = _hook_method('ticks')
+        def check(value):
+            if not isinstance(value, set):
                 raise TypeAssertionError(self, value)
+            tracked = token is not None and isinstance(value, Tracked)
+            if tracked:
+                items, marker = value.unchecked(token)
+            elif executor is not None and strategy is None and len(value) > chunk_size:
+                items = list(value)
+                if parallel.first_failure(executor, self.parameters[0], items, chunk_size) is not None:
+                    raise TypeAssertionError(self, value)
+                return
+            if tracked:
+                mode = None
+            else:
+                mode, items = (None, value) if strategy is None else strategy.select(value)
+            if ticks is not None:
+                items = ticks(items)
+            for item in items:
+                if type(item) in accepted or learn(type(item)):
+                    continue
+                try:
+                    checker(item)
+                except TypeAssertionError:
+                    raise sample_failure(self, value, strategy, mode)
+            if strategy is not None:
+                strategy.record(mode, True)
+            elif tracked:
+                value.checked(token, marker)
+        return cached_check(check, self.options)
 
 class Dictionary(ParametrizedTypeAssertion):
     """Parametrized type assertion for a fixed type
     dictionary in which both the keys and the types
     must agree to their specified type assertions.
     """
-    def assertion(self, value):
-        k_assert = self.parameters[0]
-        v_assert = self.parameters[1]
-        for key, val in value.iteritems():
-            try:
-                assert_type(key, k_assert)
-                assert_type(val, v_assert)
-            except:
-                raise TypeAssertionError(self, value)
+    def compile(self):
+        k_checker = compile_assertion(self.parameters[0])
+        v_checker = compile_assertion(self.parameters[1])
+        k_accepted, k_learn = accepted_types(self.parameters[0])
+        v_accepted, v_learn = accepted_types(self.parameters[1])
+        strategy = self.options.get('sample')
+        executor = self.options.get('parallel')
+        chunk_size = self.options.get('chunk_size', parallel.DEFAULT_CHUNK_SIZE)
+        pairs = Tuple(*self.parameters)
+        token = object() if self.options.get('incremental') and strategy is None else None
+        ticks = _hook_method('ticks')
+        def check(value):
+            tracked = token is not None and isinstance(value, Tracked)
+            if tracked:
+                keys, marker = value.unchecked(token)
+            elif executor is not None and strategy is None and len(value) > chunk_size:
+                failure = parallel.first_failure(executor, pairs, value.items(),
+                                                 chunk_size, Exception)
+                if failure is not None:
+                    raise TypeAssertionError(self, value)
+                return
+            if tracked and keys is not value:
+                mode, items = None, ((key, value[key]) for key in keys)
+            elif strategy is None:
+                mode, items = None, value.iteritems()
+            else:
+                mode, keys = strategy.select(value)
+                items = ((key, value[key]) for key in keys)
+            if ticks is not None:
+                items = ticks(items)
+            for key, val in items:
+                try:
+                    if not (type(key) in k_accepted or k_learn(type(key))):
+                        k_checker(key)
+                    if not (type(val) in v_accepted or v_learn(type(val))):
+                        v_checker(val)
+                except BudgetExceededError:
+                    raise
+                except Exception:
+                    raise sample_failure(self, value, strategy, mode)
+            if strategy is not None:
+                strategy.record(mode, True)
+            elif tracked:
+                value.checked(token, marker)
+        return cached_check(check, self.options)
 
 class Boolean(TypeAssertion):
     """Assertion for verifying that
     the given parameter is a boolean value.
     """
-    def assertion(self, value):
-        if not isinstance(value, bool):
-            raise TypeAssertionError(self, value)
+    def accepts_type(self, cls):
+        return instance_verdict(cls, bool)
+
+    def compile(self):
+        def check(value):
+            if not isinstance(value, bool):
+                raise TypeAssertionError(self, value)
+        return check
 
 class Numeric(TypeAssertion):
     """Assertion for validating that
     the given value is either an
     integer or a float.
     """
-    def assertion(self, value):
+    types = frozenset([int, long, float, bool])
+
+    def accepts_type(self, cls):
+        if issubclass(cls, (int, long, float)):
+            return True
+        elif numpy is not None and issubclass(cls, (numpy.integer, numpy.floating, numpy.bool_)):
+            return True
+        return None
+
+    def compile(self):
+        types = self.types
+        numeric = compile_assertion(Or(int, float))
+        def check(value):
+            if type(value) in types:
+                return
+            try:
+                numeric(value)
+            except TypeAssertionError:
+                raise TypeAssertionError(self, value)
+        return check
+
+class Array(ParametrizedTypeAssertion):
+    """Assertion for NumPy arrays (and array-likes
+    such as pandas columns), checked with whole-array
+    operations instead of one assertion per element.
+
+    Every option is optional:
+      dtype: a NumPy dtype (or anything numpy.dtype
+        accepts), an abstract scalar type such as
+        numpy.floating, or Numeric for integers and floats.
+      ndim: the number of dimensions.
+      shape: a tuple in which None matches any size.
+      finite: True to reject NaN and infinite values.
+      min, max: inclusive bounds for every value.
+    """
+    option_names = frozenset(['dtype', 'ndim', 'shape', 'finite', 'min', 'max'])
+
+    def __init__(self, *args, **kwargs):
+        if numpy is None:
+            raise BadTypeSpecError('Array assertions require numpy')
+        unknown = set(kwargs) - self.option_names
+        if args or unknown:
+            raise BadTypeSpecError('Array only accepts the options: ' +
+                                   ', '.join(sorted(self.option_names)))
+        super(Array, self).__init__(**kwargs)
+
+    def accepts_type(self, cls):
+        if hasattr(cls, '__array__'):
+            return None
+        return None if instance_verdict(cls, numpy.ndarray) is not False else False
+
+    def compile(self):
+        options = self.options
+        dtype_matches = self._dtype_matcher(options.get('dtype'))
+        shape = options.get('shape')
+        ndim = len(shape) if shape is not None else options.get('ndim')
+        finite = options.get('finite', False)
+        low = options.get('min')
+        high = options.get('max')
+
+        def check(value):
+            if not isinstance(value, numpy.ndarray):
+                if not hasattr(value, '__array__'):
+                    raise TypeAssertionError(self, value)
+                value = numpy.asarray(value)
+            if dtype_matches is not None and not dtype_matches(value.dtype):
+                raise TypeAssertionError(self, value)
+            if ndim is not None and value.ndim != ndim:
+                raise TypeAssertionError(self, value)
+            if shape is not None:
+                for size, expected in izip(value.shape, shape):
+                    if expected is not None and size != expected:
+                        raise TypeAssertionError(self, value)
+            if value.size == 0:
+                return
+            if finite and value.dtype.kind in 'fc' and not numpy.isfinite(value).all():
+                raise TypeAssertionError(self, value)
+            if low is not None and not value.min() >= low:
+                raise TypeAssertionError(self, value)
+            if high is not None and not value.max() <= high:
+                raise TypeAssertionError(self, value)
+        return check
+
+    def _dtype_matcher(self, dtype):
+        """Function that tells if an array dtype is valid."""
+        if dtype is None:
+            return None
+        elif dtype is Numeric or isinstance(dtype, Numeric):
+            return lambda found: found.kind in 'biuf'
+        elif isclass(dtype) and issubclass(dtype, numpy.generic):
+            return lambda found: numpy.issubdtype(found, dtype)
+        expected = numpy.dtype(dtype)
+        return lambda found: found == expected
+
+class Iterable(ParametrizedTypeAssertion):
+    """Parametrized assertion for iterables (such as
+    generators) whose elements are checked lazily,
+    as they are consumed, without materializing them.
+
+    When it is the assertion of an argument of a
+    typechecked function, the function receives a
+    CheckedIterator over the original value. An element
+    that fails raises a TypeAssertionError at the point
+    where it is consumed, with its index as the path.
+    Elsewhere (e.g. inside a List) it only verifies that
+    the value is iterable.
+    """
+    wraps = True
+
+    def accepts_type(self, cls):
+        if hasattr(cls, '__iter__') or hasattr(cls, '__getitem__'):
+            return None
+        return False
+
+    def compile(self):
+        checker = compile_assertion(self.parameters[0])
+        def check(value):
+            try:
+                iterator = iter(value)
+            except TypeError:
+                raise TypeAssertionError(self, value)
+            return CheckedIterator(iterator, checker)
+        return check
+
+class CheckedIterator(object):
+    """Iterator that checks every element of another
+    one before handing it over."""
+    def __init__(self, iterator, checker):
+        self.iterator = iterator
+        self.checker = checker
+        self.index = 0
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        item = next(self.iterator)
         try:
-            assert_type(value, Or(int, float))
-        except TypeAssertionError:
-            raise TypeAssertionError(self, value)
+            self.checker(item)
+        except TypeAssertionError as e:
+            raise TypeAssertionError(e.assertion, e.target, '[%i]' % self.index)
+        self.index += 1
+        return item
+
+class _Missing(object):
+    """Target of the failures of required keys
+    missing from a Record."""
+    def __repr__(self):
+        return '<missing>'
+
+    __str__ = __repr__
+
+MISSING = _Missing()
+
+# Maximum amount of failures collected by a Record.
+MAX_FAILURES = 100
+
+class Record(ParametrizedTypeAssertion):
+    """Assertion for dictionaries with a known set of
+    keys (such as JSON objects), each with its own
+    assertion. Receives a dictionary with the required
+    keys and their assertions, and accepts the options:
+      optional: a dictionary of keys that may be missing.
+      extra: False to reject keys not given in either.
+
+    The whole value is checked in a single iterative
+    pass: nested Records, and plain List, Dictionary and
+    Tuple assertions (without options) are walked with
+    an explicit stack, so only the failing leaves raise.
+    Every failure (up to MAX_FAILURES) is collected with
+    its JSON path; the first one is raised, with the rest
+    in its `failures` attribute.
+    """
+    def __init__(self, fields, **options):
+        if not isinstance(fields, dict) or not isinstance(options.get('optional', {}), dict):
+            raise BadTypeSpecError('Record fields must be given in a dictionary')
+        super(Record, self).__init__(fields, **options)
+
+    def __repr__(self):
+        fields = self.parameters[0]
+        optional = self.options.get('optional') or {}
+        reprs = ['%s=%s' % (key, assertion_name(fields[key])) for key in sorted(fields)]
+        reprs += ['%s?=%s' % (key, assertion_name(optional[key])) for key in sorted(optional)]
+        if self.options.get('extra', True) is False:
+            reprs.append('extra=False')
+        return 'Record(' + ', '.join(reprs) + ')'
+
+    def accepts_type(self, cls):
+        return None if instance_verdict(cls, dict) is not False else False
+
+    def compile(self):
+        root = _plan(self)
+        visit = _hook_method('visit')
+        ticks = _hook_method('ticks')
+        def check(value):
+            failures = _validate(root, value, visit, ticks)
+            if failures:
+                error = failures[0]
+                error.failures = failures
+                raise error
+        return check
+
+# Kinds of nodes of a Record validation plan.
+_LEAF, _RECORD, _LIST, _DICTIONARY, _TUPLE = range(5)
+
+def _plan(assertion):
+    """Validation plan of an assertion nested in a
+    Record: a tuple whose first item is its kind, or
+    None for assertions that always pass."""
+    cls = type(assertion)
+    if assertion is Any or cls is Any:
+        return None
+    elif cls is Record:
+        optional = assertion.options.get('optional') or {}
+        fields = [(key, field, _plan(field), True)
+                  for key, field in sorted(assertion.parameters[0].iteritems())]
+        fields += [(key, field, _plan(field), False) for key, field in sorted(optional.iteritems())]
+        known = None
+        if assertion.options.get('extra', True) is False:
+            known = frozenset(key for key, _, _, _ in fields)
+        return (_RECORD, assertion, fields, known)
+    elif cls is List and not assertion.options:
+        return (_LIST, assertion, _plan(assertion.parameters[0]))
+    elif cls is Dictionary and not assertion.options:
+        key, value = assertion.parameters
+        return (_DICTIONARY, assertion, _plan(key), _plan(value))
+    elif cls is Tuple and not assertion.options:
+        return (_TUPLE, assertion, [_plan(param) for param in assertion.parameters])
+    accepted, learn = accepted_types(assertion)
+    return (_LEAF, assertion, compile_assertion(assertion), accepted, learn)
+
+def _validate(root, value, visit=None, ticks=None):
+    """Failures of a value against a validation plan.
+
+    Only containers go through the stack: the leaves of
+    each one are checked as it is visited, so a leaf whose
+    type always passes costs a set lookup, and the failures
+    of a container come before the ones nested deeper.
+    Paths are kept as (parent, key) links and only
+    rendered for the failures. visit, if given, is
+    called with every nested container of the right
+    type and its path before walking it, and ticks
+    wraps the iteration over the leaves of Lists and
+    Dictionaries (see pysignature.budget)."""
+    failures = []
+    stack = [(value, root, None)]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        value, node, path = pop()
+        kind = node[0]
+        if kind == _RECORD:
+            _, assertion, fields, known = node
+            if not isinstance(value, dict):
+                failures.append(TypeAssertionError(assertion, value, _json_path(path)))
+            else:
+                if visit is not None and path is not None:
+                    visit(value, path)
+                nested = []
+                for key, field, child, required in fields:
+                    item = value.get(key, MISSING)
+                    if item is MISSING:
+                        if required:
+                            failures.append(_missing(field, (path, key)))
+                    elif child is None:
+                        continue
+                    elif child[0] != _LEAF:
+                        nested.append((item, child, (path, key)))
+                    elif type(item) not in child[3] and not child[4](type(item)):
+                        _check_leaf(child, item, (path, key), failures)
+                if known is not None:
+                    for key in value:
+                        if key not in known:
+                            failures.append(TypeAssertionError(assertion, value[key],
+                                                               _json_path((path, key))))
+                nested.reverse()
+                stack.extend(nested)
+        elif kind == _LIST:
+            child = node[2]
+            if not isinstance(value, list):
+                failures.append(TypeAssertionError(node[1], value, _json_path(path)))
+                continue
+            if visit is not None and path is not None:
+                visit(value, path)
+            if child is None:
+                continue
+            elif child[0] != _LEAF:
+                for idx in xrange(len(value) - 1, -1, -1):
+                    push((value[idx], child, (path, idx)))
+            else:
+                _, _, check, accepted, learn = child
+                for idx, item in enumerate(value if ticks is None else ticks(value)):
+                    cls = type(item)
+                    if cls in accepted or learn(cls):
+                        continue
+                    try:
+                        check(item)
+                    except TypeAssertionError as e:
+                        failures.append(_leaf_failure(e, (path, idx)))
+                        if len(failures) >= MAX_FAILURES:
+                            break
+        elif kind == _DICTIONARY:
+            if not isinstance(value, dict):
+                failures.append(TypeAssertionError(node[1], value, _json_path(path)))
+                continue
+            if visit is not None and path is not None:
+                visit(value, path)
+            key_node, value_node = node[2], node[3]
+            nested = []
+            items = value.iteritems()
+            for key, item in (items if ticks is None else ticks(items)):
+                if key_node is None:
+                    pass
+                elif key_node[0] != _LEAF:
+                    nested.append((key, key_node, (path, key)))
+                elif type(key) not in key_node[3] and not key_node[4](type(key)):
+                    _check_leaf(key_node, key, (path, key), failures)
+                if value_node is None:
+                    pass
+                elif value_node[0] != _LEAF:
+                    nested.append((item, value_node, (path, key)))
+                elif type(item) not in value_node[3] and not value_node[4](type(item)):
+                    _check_leaf(value_node, item, (path, key), failures)
+                if len(failures) >= MAX_FAILURES:
+                    break
+            nested.reverse()
+            stack.extend(nested)
+        elif kind == _TUPLE:
+            children = node[2]
+            if not isinstance(value, tuple) or len(value) != len(children):
+                failures.append(TypeAssertionError(node[1], value, _json_path(path)))
+                continue
+            nested = []
+            for idx, item in enumerate(value):
+                child = children[idx]
+                if child is None:
+                    continue
+                elif child[0] != _LEAF:
+                    nested.append((item, child, (path, idx)))
+                elif type(item) not in child[3] and not child[4](type(item)):
+                    _check_leaf(child, item, (path, idx), failures)
+            nested.reverse()
+            stack.extend(nested)
+        if len(failures) >= MAX_FAILURES:
+            return failures[:MAX_FAILURES]
+    return failures
+
+def _check_leaf(node, value, path, failures):
+    """Check a leaf whose type does not always pass."""
+    try:
+        node[2](value)
+    except TypeAssertionError as e:
+        failures.append(_leaf_failure(e, path))
+
+def _leaf_failure(error, path):
+    return TypeAssertionError(error.assertion, error.target, _json_path(path, error.path))
+
+def _missing(field, path):
+    """Failure of a required key missing from a Record."""
+    if isclass(field) and issubclass(field, TypeAssertion):
+        field = field()
+    elif not isinstance(field, TypeAssertion):
+        field = getattr(field, '__name__', field)
+    return TypeAssertionError(field, MISSING, _json_path(path))
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+def _json_path(path, suffix=None):
+    """Render a (parent, key) path as a JSON path,
+    followed by the path of a nested failure."""
+    parts = []
+    while path is not None:
+        path, key = path
+        if isinstance(key, (int, long)):
+            parts.append('[%i]' % key)
+        elif isinstance(key, basestring) and _IDENTIFIER.match(key):
+            parts.append('.' + key)
+        else:
+            parts.append('[%r]' % (key,))
+    parts.append('$')
+    rendered = ''.join(reversed(parts))
+    if suffix is not None:
+        rendered += suffix[1:] if suffix.startswith('$') else suffix
+    return rendered if rendered != '$' or suffix is not None else None
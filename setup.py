@@ -22,6 +22,7 @@ setup(
     url='https://github.com/intelimetrica/pysignature',
     long_description=open('README.md').read(),
     install_requires=[''],
+    extras_require={'numpy': ['numpy']},
     test_suite='pysignature.test',
     classifiers=[
         'Development Status :: 3 - Alpha',